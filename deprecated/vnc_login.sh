@@ -28,8 +28,8 @@ sleep 1
 echo "Starting x11vnc on port 5900..."
 x11vnc -display :99 -forever -nopw -shared -bg -rfbport 5900
 
-echo "Starting manual_login.py in centered xterm..."
+echo "Starting src.manual_login in centered xterm..."
 echo "DISPLAY is: $DISPLAY"
 # Use the virtual environment's python and keep the window open if it crashes/ends
 # Adding -hold for extra safety
-xterm -hold -fa 'Monospace' -fs 12 -geometry 140x45+250+100 -e bash -l -c "./venv/bin/python3 manual_login.py; echo; echo '[Processo terminato. Premi INVIO per chiudere questa finestra]'; read"
+xterm -hold -fa 'Monospace' -fs 12 -geometry 140x45+250+100 -e bash -l -c "./venv/bin/python3 -m src.manual_login; echo; echo '[Processo terminato. Premi INVIO per chiudere questa finestra]'; read"
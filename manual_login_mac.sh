@@ -25,4 +25,4 @@ echo "🔐 FBClicker - Manual Login (M1 Mac)"
 echo "📁 Session will be saved to: $SESSIONS_DIR"
 echo ""
 
-python manual_login.py "$@"
+python -m src.manual_login "$@"
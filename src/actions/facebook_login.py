@@ -1,6 +1,6 @@
 """Facebook login handler with session persistence - ASYNC version."""
-import os
-from playwright.async_api import Page
+from pathlib import Path
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 import structlog
 
 from src.config import settings
@@ -14,11 +14,28 @@ class FacebookLogin:
     """Handles Facebook login with human-like behavior - ASYNC version."""
     
     FB_LOGIN_URL = "https://www.facebook.com/"
+    LOGIN_BUTTON_SELECTOR = 'button[name="login"], input[type="submit"]'
+    # How long to wait (ms) for a login form field before giving up on it
+    FIELD_TIMEOUT = 5000
+    # Page type detection only needs the top-left of the page
+    SCREENSHOT_CLIP = {"x": 0, "y": 0, "width": 1280, "height": 720}
+    
+    # Common cookie button selectors for Facebook, matched as one CSS union
+    COOKIE_SELECTOR = ", ".join((
+        'button[data-cookiebanner="accept_button"]',
+        'button[title="Consenti tutti i cookie"]',
+        'button[title="Allow all cookies"]',
+        '[aria-label="Allow all cookies"]',
+        '[aria-label="Consenti tutti i cookie"]',
+    ))
     
     def __init__(self, page: Page, analyzer: ScreenshotAnalyzer):
         self.page = page
         self.human = HumanBehavior(page)
         self.analyzer = analyzer
+        self._shot_dir = Path(settings.screenshots_dir)
+        self._shot_dir.mkdir(parents=True, exist_ok=True)
+        self._keep_shots = settings.keep_login_screenshots
     
     async def is_logged_in(self) -> bool:
         """Check if already logged in to Facebook."""
@@ -27,28 +44,27 @@ class FacebookLogin:
             await self.page.goto(self.FB_LOGIN_URL)
             await self.human.random_delay(2, 4)
             
-            # Take screenshot and analyze
-            screenshot = await self._take_screenshot("login_check")
-            page_type = await self.analyzer.detect_page_type(screenshot)
-            
-            # Check for actual auth cookies in the context
-            # This is the single most reliable check
-            cookies = await self.page.context.cookies()
-            cookie_names = [c['name'] for c in cookies]
+            # Cheap checks first: auth cookies and URL answer the common case
+            # without a screenshot + OCR pass
+            cookies = await self.page.context.cookies(self.FB_LOGIN_URL)
+            cookie_names = {c['name'] for c in cookies}
             has_auth = 'c_user' in cookie_names and 'xs' in cookie_names
+            current_url = self.page.url
             
-            if page_type == "login":
-                logger.info("Not logged in (page type: login)")
+            if "login" in current_url or "checkpoint" in current_url:
+                logger.info("Not logged in (URL indicator)")
                 return False
             
             if has_auth:
                 logger.info("Already logged in (auth cookies found)")
                 return True
-                
-            # Fallback to URL and page type if cookies are hidden or weird
-            current_url = self.page.url
-            if "login" in current_url or "checkpoint" in current_url:
-                logger.info("Not logged in (URL indicator)")
+            
+            # Ambiguous: fall back to screenshot analysis
+            screenshot = await self._take_screenshot("login_check")
+            page_type = await self.analyzer.detect_page_type(screenshot)
+            
+            if page_type == "login":
+                logger.info("Not logged in (page type: login)")
                 return False
                 
             if page_type in ["group_home", "member_requests", "post_approval"]:
@@ -65,6 +81,7 @@ class FacebookLogin:
     async def login(self) -> bool:
         """Perform Facebook login with credentials."""
         logger.info("Starting Facebook login")
+        email, password = settings.fb_email, settings.fb_password
         
         try:
             # Go to login page
@@ -80,31 +97,27 @@ class FacebookLogin:
             # Find and fill email field
             logger.info("Entering email")
             email_field = self.page.locator('input[name="email"]')
-            if await email_field.is_visible():
-                await email_field.click()
-                await self.human.random_delay(0.3, 0.6)
-                await self.human.human_type('input[name="email"]', settings.fb_email)
+            try:
+                # human_type clicks the field (auto-waiting for it) and pauses before typing
+                await self.human.human_type(email_field, email, timeout=self.FIELD_TIMEOUT)
+            except PlaywrightTimeoutError:
+                logger.warning("Email field not found")
             
             await self.human.random_delay(0.5, 1.0)
             
             # Find and fill password field
             logger.info("Entering password")
             password_field = self.page.locator('input[name="pass"]')
-            if await password_field.is_visible():
-                await password_field.click()
-                await self.human.random_delay(0.3, 0.6)
-                await self.human.human_type('input[name="pass"]', settings.fb_password)
+            try:
+                await self.human.human_type(password_field, password, timeout=self.FIELD_TIMEOUT)
+            except PlaywrightTimeoutError:
+                logger.warning("Password field not found")
             
             await self.human.random_delay(0.5, 1.5)
             
             # Click login button
             logger.info("Clicking login button")
-            login_button = self.page.locator('button[name="login"]')
-            if await login_button.is_visible():
-                await login_button.click()
-            else:
-                # Try alternative login button selector
-                await self.page.locator('input[type="submit"]').click()
+            await self.page.locator(self.LOGIN_BUTTON_SELECTOR).first.click()
             
             # Wait for navigation
             await self.human.random_delay(3, 5)
@@ -133,23 +146,13 @@ class FacebookLogin:
     async def _handle_cookie_dialog(self):
         """Handle cookie consent dialog if present."""
         try:
-            # Common cookie button selectors for Facebook
-            cookie_selectors = [
-                'button[data-cookiebanner="accept_button"]',
-                'button[title="Consenti tutti i cookie"]',
-                'button[title="Allow all cookies"]',
-                '[aria-label="Allow all cookies"]',
-                '[aria-label="Consenti tutti i cookie"]',
-            ]
-            
-            for selector in cookie_selectors:
-                button = self.page.locator(selector)
-                if await button.is_visible(timeout=2000):
-                    logger.info("Accepting cookies")
-                    await button.click()
-                    await self.human.random_delay(1, 2)
-                    return
-                    
+            # One DOM pass and one round-trip for all candidate buttons
+            button = self.page.locator(self.COOKIE_SELECTOR).first
+            if await button.is_visible(timeout=2000):
+                logger.info("Accepting cookies")
+                await button.click()
+                await self.human.random_delay(1, 2)
+                
         except Exception:
             # No cookie dialog, continue
             pass
@@ -159,9 +162,17 @@ class FacebookLogin:
         logger.warning("2FA handling requires manual intervention via Telegram")
         return False
     
-    async def _take_screenshot(self, name: str) -> str:
-        """Take a screenshot for analysis."""
-        os.makedirs(settings.screenshots_dir, exist_ok=True)
-        path = f"{settings.screenshots_dir}/{name}.png"
-        await self.page.screenshot(path=path)
-        return path
+    async def _take_screenshot(self, name: str) -> bytes:
+        """Take an above-the-fold JPEG screenshot for page-type detection.
+        
+        Returns the encoded image bytes; the file is only written to disk
+        when keep_login_screenshots is on.
+        """
+        path = self._shot_dir / f"{name}.jpg" if self._keep_shots else None
+        return await self.page.screenshot(
+            path=path,
+            type="jpeg",
+            quality=70,
+            full_page=False,
+            clip=self.SCREENSHOT_CLIP,
+        )
@@ -1,25 +1,48 @@
 """Facebook group moderation actions - ASYNC version with scroll and cache support."""
+import asyncio
+import base64
 import os
+import re
 from pathlib import Path
 from typing import List, Optional, Dict
-from playwright.async_api import Page
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 from datetime import datetime
 import structlog
+import httpx
 import cv2
 import numpy as np
-from PIL import Image
 
 from src.vision.ocr_adapter import OCREngine
 from src.config import settings
+from src.cache import cache
 from src.browser.human_behavior import HumanBehavior
 from src.vision.screenshot_analyzer import ScreenshotAnalyzer, MemberRequest
-from src.vision.card_detector import CardDetector
+from src.vision.card_detector import (
+    CardDetector, DetectedCard, compute_phashes, JPEG_QUALITY, JPEG_PARAMS,
+    SIDEBAR_WIDTH, HEADER_HEIGHT, FILTER_BAR_HEIGHT
+)
 
 logger = structlog.get_logger()
 
+# UI labels matched against lowercased OCR text
+_UI_FILTER_RE = re.compile(r"approva|rifiuta|invia messaggio|richiesta")  # dropped from extra info
+_CROP_EXCLUDE_RE = re.compile(r"approva|rifiuta|•••")  # left out of the text crop bbox
+_ANTEPRIMA_STANDALONE_RE = re.compile(r"anteprima\.?")  # whole (stripped) OCR line is the link
+
+# Button color bounds (BGR) for approve/decline detection
+_LOWER_BLUE = np.array([200, 90, 0], np.uint8)     # Facebook blue #1877F2 = BGR (242,119,24)
+_UPPER_BLUE = np.array([255, 150, 60], np.uint8)
+_LOWER_GRAY = np.array([210, 210, 210], np.uint8)  # Light neutral gray decline button
+_UPPER_GRAY = np.array([248, 248, 248], np.uint8)
+_BUTTON_SCALE = 2  # Button masks run at half resolution
+_BUTTON_ROI_MARGIN = 24  # px searched beyond the content edges (~half a button height)
+_NOTIFY_CONCURRENCY = 3  # Telegram notifications in flight at once (keeps clear of flood control)
+
 class GroupModerator:
     """Handles Facebook group moderation tasks - ASYNC version."""
     
+    _dir_ready = False  # screenshots_dir created once per process
+    
     def __init__(self, page: Page, analyzer: ScreenshotAnalyzer):
         self.page = page
         self.human = HumanBehavior(page)
@@ -27,6 +50,16 @@ class GroupModerator:
         self.group_id = settings.fb_group_id
         self.screenshot_counter = 0
         self.decision_cache = {}
+        self._page_height = 0  # document scrollHeight, refreshed on every scan
+        self._viewport: Optional[dict] = None  # read lazily from the page, fixed for the session
+        self._viewport_read = False
+        self._overlay_tasks = []  # background debug overlay renders, drained at end of scan
+        self._validation_tasks = set()  # fire-and-forget AI click validations (strong refs until done)
+        self._http_client: Optional[httpx.AsyncClient] = None  # shared OpenRouter client, created lazily
+        
+        if not GroupModerator._dir_ready:
+            os.makedirs(settings.screenshots_dir, exist_ok=True)
+            GroupModerator._dir_ready = True
         
         # Initialize CardDetector
         self.card_detector = CardDetector(settings.screenshots_dir)
@@ -36,6 +69,37 @@ class GroupModerator:
         self.ocr_engine = OCREngine()
         logger.info("RapidOCR loaded.")
     
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client for OpenRouter calls (keeps the TLS connection alive)."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                base_url=settings.openrouter_base_url,
+                timeout=30.0,
+                headers={"Authorization": f"Bearer {settings.openrouter_api_key}"},
+            )
+        return self._http_client
+    
+    async def close(self):
+        """Close resources."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    @property
+    def viewport(self) -> Optional[dict]:
+        """Browser viewport {'width', 'height'}, read once (None if the page has no fixed viewport)."""
+        if not self._viewport_read:
+            self._viewport = self.page.viewport_size
+            self._viewport_read = True
+        return self._viewport
+    
+    @property
+    def viewport_height(self) -> int:
+        """Browser viewport height in pixels (864 if the page has no fixed viewport)."""
+        viewport = self.viewport
+        return viewport["height"] if viewport else 864
+    
     @property
     def member_requests_url(self) -> str:
         """URL for member requests page."""
@@ -140,29 +204,41 @@ class GroupModerator:
         notifications_to_send = []  # [(name, screenshot_path), ...]
         processed_names = set()  # Track names we've already seen
         
+        # Pending names normalized once: exact dict lookup first, then longest-first containment
+        pending_norm = {name.strip().lower(): (name, decision) for name, decision in pending_decisions.items()}
+        pending_sorted = sorted(pending_norm.items(), key=lambda kv: -len(kv[0]))
+        
         logger.info("=" * 60)
         logger.info(f"UNIFIED SCAN: {len(pending_decisions)} pending decisions")
         logger.info("=" * 60)
         
         while True:
-            # 1. Scroll down to load all content first
+            # 1. Jump to the bottom to trigger lazy loading of all cards, until the page stops growing
             logger.info("Scrolling to load all content...")
-            for i in range(3):
-                await self.human.human_scroll("down", 800)
-                await self.human.random_delay(0.5, 0.8)
+            settled = await self._scroll_until_loaded()
+            if not settled:
+                # Page kept growing: fall back to stepped human scrolling
+                logger.info("Page height not stable, falling back to stepped scroll")
+                for i in range(3):
+                    await self.human.human_scroll("down", 800)
+                    await self.human.random_delay(0.5, 0.8)
             
             # 2. Scroll back to top
             logger.info("Scrolling to top...")
             await self.page.evaluate("window.scrollTo(0, 0)")
-            await self.human.random_delay(2, 3)  # Longer delay to ensure page renders
+            if settled:
+                await self.human.random_delay(0.3, 0.6)  # Content already loaded, just let it repaint
+            else:
+                await self.human.random_delay(2, 3)  # Longer delay to ensure page renders
             
-            # 3. Take full-page screenshot
-            fullpage_path = f"{settings.screenshots_dir}/fullpage_scan.png"
-            await self.page.screenshot(path=fullpage_path, full_page=True)
+            # 3. Take full-page screenshot of the card column only, kept in memory and decoded once
+            self._page_height = await self.page.evaluate("document.documentElement.scrollHeight")
+            clip = self._content_clip()
+            raw = await self.page.screenshot(full_page=True, clip=clip, type="jpeg", quality=JPEG_QUALITY)
             
-            # 3. Detect cards
+            # 3. Detect cards off the event loop
             logger.info("Detecting cards...")
-            cards = self.card_detector.detect_cards(fullpage_path)
+            cards = await asyncio.to_thread(self._decode_and_detect, raw, clip is not None)
             
             if not cards:
                 logger.warning("No cards detected on page!")
@@ -172,26 +248,22 @@ class GroupModerator:
             
             click_performed = False
             
-            # 4. Process each card
-            for card in cards:
-                try:
-                    # Load image first (needed for OCR)
-                    image = Image.open(card.image_path)
-                    img_width, img_height = image.size
-                    
-                    # Caching disabled: always run OCR on the current card
-                    card_hash = None
-                    
-                    # RapidOCR
+            # 4-5. Hash + RapidOCR on all cards in one batch, off the event loop
+            card_hashes, predictions = await asyncio.to_thread(self._hash_and_ocr, cards, pending_norm)
+            
+            # 6. Process each card
+            for card, card_hash, prediction in zip(cards, card_hashes, predictions):
+                if prediction is None:
+                    continue  # Already notified, nothing to do (OCR skipped)
+                try:
+                    img_height, img_width = card.image_array.shape[:2]
+                    
                     logger.info("=" * 50)
-                    logger.info(f"OCR PROCESSING CARD {card.card_index}")
+                    logger.info(f"OCR RESULT CARD {card.card_index}")
                     logger.info(f"  Image path: {card.image_path}")
                     logger.info(f"  Card Y range: {card.y_start}-{card.y_end}")
                     logger.info(f"  Image dimensions: {img_width}x{img_height}")
                     
-                    predictions = self.ocr_engine.run_ocr(image)
-                    prediction = predictions[0]
-                    
                     # Extract text and identify name
                     valid_texts = []
                     logger.info(f"  OCR found {len(prediction.text_lines)} text lines:")
@@ -203,8 +275,17 @@ class GroupModerator:
                         center_y = (y1 + y2) // 2
                         center_x = (x1 + x2) // 2
                         logger.info(f"    [{idx}] '{text_content}' @ bbox={box}")
+                        lower = text_content.lower()
+                        if 'approva' in lower or 'approve' in lower:
+                            role = 'approve'
+                        elif 'rifiuta' in lower or 'decline' in lower:
+                            role = 'decline'
+                        else:
+                            role = None
                         valid_texts.append({
                             'text': text_content, 
+                            'lower': lower,
+                            'role': role,
                             'y': center_y, 
                             'x': center_x,
                             'bbox': box
@@ -219,14 +300,14 @@ class GroupModerator:
                         continue
                     
                     # Extract extra info (all text except name)
-                    extra_texts = [t['text'] for t in valid_texts if t['text'] != detected_name and len(t['text']) >= 2]
+                    extra_texts = [t for t in valid_texts if t['text'] != detected_name and len(t['text']) >= 2]
                     # Filter out common UI elements
-                    filtered_extra = [t for t in extra_texts if not any(ui in t.lower() for ui in ['approva', 'rifiuta', 'invia messaggio', 'richiesta'])]
+                    filtered_extra = [t['text'] for t in extra_texts if not _UI_FILTER_RE.search(t['lower'])]
                     extra_info = "\n".join(filtered_extra) if filtered_extra else None
                     
                     # Check for "Anteprima" link and capture preview if present
                     preview_screenshot_path = None
-                    has_preview = any('anteprima' in t['text'].lower() for t in valid_texts)
+                    has_preview = any('anteprima' in t['lower'] for t in valid_texts)
                     if has_preview:
                         preview_screenshot_path = await self._capture_post_preview(card, valid_texts)
                         # Crop preview to just the modal content
@@ -235,22 +316,13 @@ class GroupModerator:
                             if cropped_modal:
                                 preview_screenshot_path = cropped_modal
                     
-                    # EXTRACT ACTION BUTTONS
+                    # EXTRACT ACTION BUTTONS (last OCR line per role wins, center of its bbox)
                     action_buttons = {}
                     for t in valid_texts:
-                        txt_lower = t['text'].lower()
-                        if 'approva' in txt_lower or 'approve' in txt_lower:
-                            bbox = t.get('bbox')
-                            if bbox:
-                                cx = int((bbox[0] + bbox[2]) / 2)
-                                cy = int((bbox[1] + bbox[3]) / 2)
-                                action_buttons['approve'] = [cx, cy]
-                        elif 'rifiuta' in txt_lower or 'decline' in txt_lower:
-                            bbox = t.get('bbox')
-                            if bbox:
-                                cx = int((bbox[0] + bbox[2]) / 2)
-                                cy = int((bbox[1] + bbox[3]) / 2)
-                                action_buttons['decline'] = [cx, cy]
+                        role = t['role']
+                        if role and t.get('bbox'):
+                            bbox = t['bbox']
+                            action_buttons[role] = [int((bbox[0] + bbox[2]) / 2), int((bbox[1] + bbox[3]) / 2)]
                     
                     logger.info(f"Card {card.card_index}: '{detected_name}'"  + (" [has preview]" if preview_screenshot_path else ""))
                     if extra_info:
@@ -263,11 +335,13 @@ class GroupModerator:
                     
                     # CHECK 1: Is this name in pending decisions?
                     decision = None
-                    for pending_name, pending_decision in pending_decisions.items():
-                        if self._names_match(detected_name, pending_name):
-                            decision = pending_decision
-                            matched_name = pending_name
-                            break
+                    detected_norm = detected_name.strip().lower()
+                    match = pending_norm.get(detected_norm)
+                    if match is None:
+                        match = next((entry for key, entry in pending_sorted
+                                      if key in detected_norm or detected_norm in key), None)
+                    if match:
+                        matched_name, decision = match
                     
                     if decision:
                         # Execute the decision (click approve/decline)
@@ -278,23 +352,16 @@ class GroupModerator:
                         target_text = "approva" if decision == "approve" else "rifiuta"
                         
                         for t in valid_texts:
-                            if target_text in t['text'].lower():
-                                bbox = t.get('bbox')
-                                if bbox:
-                                    # Click at center of bbox
-                                    center_x = int((bbox[0] + bbox[2]) / 2)
-                                    center_y = int((bbox[1] + bbox[3]) / 2)
-                                    button_coords = (center_x, center_y)
-                                    logger.info(f"Found '{target_text}' via OCR bbox: {bbox} -> center ({center_x}, {center_y})")
-                                    break
+                            if target_text in t['lower'] and t.get('bbox'):
+                                bbox = t['bbox']
+                                button_coords = (int((bbox[0] + bbox[2]) / 2), int((bbox[1] + bbox[3]) / 2))
+                                logger.info(f"Found '{target_text}' via OCR bbox: {bbox} -> center {button_coords}")
+                                break
                         
-                        # Fallback to hardcoded percentages if OCR didn't find button
-                        if not button_coords:
-                            # Use action_buttons if found earlier
-                            target = "approve" if decision == "approve" else "decline"
-                            if target in action_buttons:
-                                button_coords = tuple(action_buttons[target])
-                                logger.info(f"Using found button coords for {target}: {button_coords}")
+                        # Fallback to action_buttons (also matches English labels)
+                        if not button_coords and decision in action_buttons:
+                            button_coords = tuple(action_buttons[decision])
+                            logger.info(f"Using found button coords for {decision}: {button_coords}")
                         
                         if not button_coords:
                             # Ultimate fallback: hardcoded estimates
@@ -347,14 +414,14 @@ class GroupModerator:
                         abs_x, abs_y = self.card_detector.get_absolute_coords(card, button_coords[0], button_coords[1])
                         
                         # SCROLL the card into viewport before clicking
-                        viewport_height = 864  # Typical viewport height
+                        viewport_height = self.viewport_height
                         scroll_to_y = max(0, abs_y - viewport_height // 2)  # Center the button in viewport
                         # logger.info(f"Scrolling page to Y={scroll_to_y}")
                         await self.page.evaluate(f"window.scrollTo(0, {scroll_to_y})")
                         await self.human.random_delay(0.5, 0.8)
                         
                         # Get ACTUAL scroll position (browser clamps if page is shorter than requested)
-                        actual_scroll_y = await self.page.evaluate("window.scrollY")
+                        actual_scroll_y = await self._actual_scroll_y(scroll_to_y, viewport_height)
                         
                         # Now click at VIEWPORT coordinates using ACTUAL scroll position
                         viewport_y = abs_y - actual_scroll_y
@@ -384,8 +451,8 @@ class GroupModerator:
                         # Debug log to see what text we actually found
                         logger.info(f"detected_texts: {[t['text'] for t in valid_texts]}")
                     
-                    # Crop card to text content only (using OCR bbox)
-                    cropped_card_path = self._crop_card_to_text_bbox(card.image_path, valid_texts)
+                    # Crop card to text content only (using OCR bbox); only the crop hits disk
+                    cropped_card_path = self._crop_card_to_text_bbox(card, valid_texts)
                     # Tuple: (name, screenshot_path, extra_info, preview_path, card_hash, action_buttons, is_unanswered, cropped_path)
                     notifications_to_send.append((detected_name, cropped_card_path, extra_info, preview_screenshot_path, card_hash, action_buttons, is_unanswered, cropped_card_path))
                     
@@ -393,7 +460,7 @@ class GroupModerator:
                     logger.error(f"Error processing card {card.card_index}", error=str(e))
                     continue
             
-            # 5. If no click performed, we're done scanning
+            # 7. If no click performed, we're done scanning
             if not click_performed:
                 logger.info("No more actions to take, finishing scan")
                 break
@@ -403,19 +470,119 @@ class GroupModerator:
             logger.info("Click performed - exiting scan (layout changed, restart poll for next decision)")
             break
         
-        # 6. Send all accumulated notifications
-        # 6. Send all accumulated notifications
+        # 8. Send all accumulated notifications
         if notifications_to_send:
             logger.info(f"Sending {len(notifications_to_send)} potential notifications...")
-            for name, screenshot_path, extra_info, preview_path, card_hash, action_buttons, is_unanswered, cropped_path in notifications_to_send:
-                try:
-                    await telegram_callback(name, screenshot_path, extra_info, preview_path, card_hash, action_buttons, is_unanswered, cropped_path)
-                except Exception as e:
-                    logger.error(f"Failed to send notification for {name}", error=str(e))
+            send_slots = asyncio.Semaphore(_NOTIFY_CONCURRENCY)
+            
+            async def notify(args):
+                async with send_slots:
+                    await telegram_callback(*args)
+            
+            results = await asyncio.gather(
+                *(notify(args) for args in notifications_to_send),
+                return_exceptions=True
+            )
+            for args, result in zip(notifications_to_send, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to send notification for {args[0]}", error=str(result))
+        
+        # Let background debug overlays finish before the next scan
+        if self._overlay_tasks:
+            await asyncio.gather(*self._overlay_tasks, return_exceptions=True)
+            self._overlay_tasks.clear()
         
         logger.info(f"Unified scan complete: {len(actions_taken)} actions, {len(notifications_to_send)} notifications queued")
         return actions_taken
     
+    async def _scroll_until_loaded(self, timeout: float = 8.0, stable_for: float = 1.0) -> bool:
+        """Keep jumping to the bottom until scrollHeight stops growing.
+        
+        Lazy-loaded cards show up as a taller document, so the page counts as
+        loaded once scrollHeight is unchanged for stable_for seconds. Returns
+        False if it was still growing after timeout seconds.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        last_height = -1
+        stable_since = loop.time()
+        while loop.time() < deadline:
+            height = await self.page.evaluate(
+                "() => { const h = document.documentElement.scrollHeight; window.scrollTo(0, h); return h; }"
+            )
+            now = loop.time()
+            if height != last_height:
+                last_height, stable_since = height, now
+            elif now - stable_since >= stable_for:
+                return True
+            await asyncio.sleep(0.25)
+        return False
+    
+    async def _actual_scroll_y(self, scroll_to_y: int, viewport_height: int) -> int:
+        """Scroll position the browser settles on after scrollTo(0, scroll_to_y).
+        
+        Clamped locally against the page height measured during the scan; only
+        queries window.scrollY when that height is unknown.
+        """
+        if self._page_height:
+            return min(scroll_to_y, max(0, self._page_height - viewport_height))
+        return await self.page.evaluate("window.scrollY")
+    
+    def _content_clip(self) -> Optional[dict]:
+        """Full-page clip covering the card column (no sidebar, header or filter bar).
+        
+        Returns None when the page/viewport size is unknown, meaning capture the whole page.
+        """
+        viewport = self.viewport
+        content_top = HEADER_HEIGHT + FILTER_BAR_HEIGHT
+        if not viewport or self._page_height <= content_top or viewport["width"] <= SIDEBAR_WIDTH:
+            return None
+        return {
+            "x": SIDEBAR_WIDTH,
+            "y": content_top,
+            "width": viewport["width"] - SIDEBAR_WIDTH,
+            "height": self._page_height - content_top,
+        }
+    
+    def _decode_and_detect(self, raw: bytes, content_only: bool = False) -> list:
+        """Decode a JPEG screenshot and detect cards (CPU-bound, run in a worker thread)."""
+        fullpage = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+        if fullpage is None:
+            logger.error("Failed to decode full-page screenshot")
+            return []
+        # Card images are views into the decoded screenshot
+        return self.card_detector.detect_cards_from_array(fullpage, content_only=content_only)
+    
+    def _hash_and_ocr(self, cards: list, pending_norm: dict) -> tuple:
+        """Perceptual hash + OCR for every card (CPU-bound, run in a worker thread).
+        
+        Predictions are None for cards whose OCR was skipped as already notified.
+        """
+        # Hash is stored with the notification
+        card_hashes = compute_phashes([card.image_array for card in cards])
+        skip = [self._is_known_card(card_hash, pending_norm) for card_hash in card_hashes]
+        
+        logger.info(f"OCR PROCESSING {skip.count(False)} CARDS")
+        ocr_results = iter(self.ocr_engine.run_ocr_batch(
+            [card.image_array for card, skipped in zip(cards, skip) if not skipped]
+        ))
+        predictions = [None if skipped else next(ocr_results) for skipped in skip]
+        return card_hashes, predictions
+    
+    def _is_known_card(self, card_hash: str, pending_norm: dict) -> bool:
+        """Check if a card's OCR can be skipped (opt-in via card_hash_skip_ocr).
+        
+        True when the hash matches an already-notified request that has no
+        pending decision, so there is nothing to click or notify.
+        """
+        if not settings.card_hash_skip_ocr:
+            return False
+        name = cache.is_hash_similar(card_hash, settings.card_hash_threshold)
+        if not name or name.strip().lower() in pending_norm:
+            return False
+        logger.info(f"Card matches already-notified '{name}' by hash, skipping OCR")
+        return True
+    
     # Keep scan_all_requests as a simpler wrapper for backward compatibility
     async def scan_all_requests(self) -> List[MemberRequest]:
         """Legacy method - now just returns empty list, use process_and_notify instead."""
@@ -486,13 +653,9 @@ class GroupModerator:
         logger.info("Approving member", name=request.name)
         
         try:
-            # Take a screenshot of current viewport
-            await self._take_screenshot("before_click")
-            current_path = Path(self.analyzer.screenshots_dir) / "before_click.png"
-            
-            # Load the screenshot and find approve button
-            import cv2
-            viewport_img = cv2.imread(str(current_path))
+            # Take a screenshot of current viewport (in memory) and find approve button
+            raw = await self._screenshot_bytes("before_click")
+            viewport_img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
             if viewport_img is None:
                 logger.error("Failed to load viewport screenshot")
                 return False
@@ -502,44 +665,14 @@ class GroupModerator:
             
             # The card should be visible. Find ALL blue approve buttons on screen
             # and click the one that's most likely ours (based on expected position)
-            hsv = cv2.cvtColor(viewport_img, cv2.COLOR_BGR2HSV)
-            
-            # Blue button detection (same as card_detector)
-            lower_blue = np.array([100, 150, 150])
-            upper_blue = np.array([120, 255, 255])
-            mask_blue = cv2.inRange(hsv, lower_blue, upper_blue)
-            
-            kernel = np.ones((5,5), np.uint8)
-            mask_blue = cv2.morphologyEx(mask_blue, cv2.MORPH_CLOSE, kernel)
-            contours, _ = cv2.findContours(mask_blue, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Find all approve buttons IN THE CONTENT AREA
-            # Exclude buttons in sidebar (x < 360) and header (y < 276)
-            SIDEBAR_WIDTH = 360
-            HEADER_HEIGHT = 276
-            
-            buttons = []
-            for c in contours:
-                x, y, w, h = cv2.boundingRect(c)
-                area = w * h
-                ar = w / float(h) if h > 0 else 0
-                center_x = x + w // 2
-                center_y = y + h // 2
-                
-                # Button criteria: 
-                # 1. Reasonable size and aspect ratio
-                # 2. In content area (not sidebar, not header where "Approve All" is)
-                if (area > 1000 and w > 50 and h > 25 and 1.5 < ar < 6.0 and
-                    center_x > SIDEBAR_WIDTH and center_y > HEADER_HEIGHT):
-                    buttons.append((center_x, center_y, area))
-                    logger.debug("Found approve button in content", x=center_x, y=center_y, area=area)
+            buttons = self._detect_buttons(viewport_img, "approve")
+            logger.debug("Found approve buttons in content", buttons=buttons)
             
             if not buttons:
                 logger.error("No approve buttons found in content area!")
                 return False
             
-            # Sort by Y position (topmost first) - this is the card we scrolled to
-            buttons.sort(key=lambda b: b[1])
+            # Topmost first - this is the card we scrolled to
             click_x, click_y, _ = buttons[0]
             
             logger.info("Clicking approve button", 
@@ -547,9 +680,7 @@ class GroupModerator:
                        buttons_found=len(buttons))
             
             # Perform the click
-            await self.page.mouse.move(click_x, click_y, steps=10)
-            await self.human.random_delay(0.2, 0.5)
-            await self.page.mouse.click(click_x, click_y)
+            await self._direct_click(click_x, click_y)
             
             logger.info("Clicked approve button", x=click_x, y=click_y)
             
@@ -569,52 +700,23 @@ class GroupModerator:
         logger.info("Declining member", name=request.name)
         
         try:
-            # Take a screenshot of current viewport
-            await self._take_screenshot("before_decline")
-            current_path = Path(self.analyzer.screenshots_dir) / "before_decline.png"
-            
-            # Load the screenshot and find decline button
-            viewport_img = cv2.imread(str(current_path))
+            # Take a screenshot of current viewport (in memory) and find decline button
+            raw = await self._screenshot_bytes("before_decline")
+            viewport_img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
             if viewport_img is None:
                 logger.error("Failed to load viewport screenshot")
                 return False
             
             viewport_h, viewport_w = viewport_img.shape[:2]
-            hsv = cv2.cvtColor(viewport_img, cv2.COLOR_BGR2HSV)
-            
-            # Gray button detection (low saturation, high value)
-            lower_gray = np.array([0, 0, 210])
-            upper_gray = np.array([180, 25, 248])
-            mask_gray = cv2.inRange(hsv, lower_gray, upper_gray)
-            
-            kernel = np.ones((5,5), np.uint8)
-            mask_gray = cv2.morphologyEx(mask_gray, cv2.MORPH_CLOSE, kernel)
-            contours, _ = cv2.findContours(mask_gray, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Filter buttons in content area
-            SIDEBAR_WIDTH = 360
-            HEADER_HEIGHT = 276
-            
-            buttons = []
-            for c in contours:
-                x, y, w, h = cv2.boundingRect(c)
-                area = w * h
-                ar = w / float(h) if h > 0 else 0
-                center_x = x + w // 2
-                center_y = y + h // 2
-                
-                # Button criteria: reasonable size, in content area
-                if (area > 1000 and w > 50 and h > 25 and 1.5 < ar < 6.0 and
-                    center_x > SIDEBAR_WIDTH and center_y > HEADER_HEIGHT):
-                    buttons.append((center_x, center_y, area))
-                    logger.debug("Found decline button", x=center_x, y=center_y, area=area)
+            
+            buttons = self._detect_buttons(viewport_img, "decline")
+            logger.debug("Found decline buttons", buttons=buttons)
             
             if not buttons:
                 logger.error("No decline buttons found in content area!")
                 return False
             
-            # Sort by Y position (topmost first)
-            buttons.sort(key=lambda b: b[1])
+            # Topmost first
             click_x, click_y, _ = buttons[0]
             
             logger.info("Clicking decline button", 
@@ -622,9 +724,7 @@ class GroupModerator:
                        buttons_found=len(buttons))
             
             # Perform the click
-            await self.page.mouse.move(click_x, click_y, steps=10)
-            await self.human.random_delay(0.2, 0.5)
-            await self.page.mouse.click(click_x, click_y)
+            await self._direct_click(click_x, click_y)
             
             await self.human.random_delay(1, 2)
             
@@ -639,6 +739,62 @@ class GroupModerator:
             logger.error("Failed to decline member", name=request.name, error=str(e))
             return False
     
+    async def _direct_click(self, x: int, y: int):
+        """Click at viewport coords, optionally after a stepped mouse move (click_move_steps).
+        
+        Each move step is a CDP round-trip; the random delay stays as timing jitter either way.
+        """
+        if settings.click_move_steps > 0:
+            await self.page.mouse.move(x, y, steps=settings.click_move_steps)
+        await self.human.random_delay(0.2, 0.5)
+        await self.page.mouse.click(x, y)
+    
+    def _detect_buttons(self, viewport_img: np.ndarray, decision: str) -> list:
+        """Approve (blue) or decline (gray) buttons in the content area, topmost first."""
+        # Only search the content area: skip sidebar (x < 360) and header (y < 276,
+        # where "Approve All" is). The ROI starts a margin before those edges so a
+        # button straddling them stays whole; blobs are then kept by their center.
+        # The ROI is a view, offsets are added back below
+        content_left = SIDEBAR_WIDTH
+        content_top = HEADER_HEIGHT + FILTER_BAR_HEIGHT
+        roi_left = content_left - _BUTTON_ROI_MARGIN
+        roi_top = content_top - _BUTTON_ROI_MARGIN
+        roi = viewport_img[roi_top:, roi_left:]
+        # Buttons are ~50px+ wide, so half resolution still gives accurate centers
+        small = cv2.resize(roi, None, fx=1 / _BUTTON_SCALE, fy=1 / _BUTTON_SCALE,
+                           interpolation=cv2.INTER_AREA)
+        
+        # Direct BGR box for the known button color, no HSV conversion needed
+        if decision == "approve":
+            mask = cv2.inRange(small, _LOWER_BLUE, _UPPER_BLUE)
+        else:
+            mask = cv2.inRange(small, _LOWER_GRAY, _UPPER_GRAY)
+        
+        buttons = self._find_button_blobs(mask, roi_left, roi_top, _BUTTON_SCALE)
+        return sorted((b for b in buttons if b[0] > content_left and b[1] > content_top),
+                      key=lambda b: b[1])
+    
+    @staticmethod
+    def _find_button_blobs(mask: np.ndarray, offset_x: int, offset_y: int, scale: int = 1) -> list:
+        """Button-shaped blobs in a color mask as (center_x, center_y, area) tuples.
+        
+        One connectedComponentsWithStats pass gives every blob's bounding box;
+        the size/aspect filter runs vectorized. Scale and offsets map a
+        downscaled ROI mask back to full-size viewport coords.
+        """
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        stats = stats[1:] * scale  # Label 0 is the background
+        x, y = stats[:, cv2.CC_STAT_LEFT], stats[:, cv2.CC_STAT_TOP]
+        w, h = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+        area = w * h
+        ar = w / np.maximum(h, 1)
+        
+        # Button criteria: reasonable size and aspect ratio
+        keep = (area > 1000) & (w > 50) & (h > 25) & (ar > 1.5) & (ar < 6.0)
+        centers_x = x[keep] + w[keep] // 2 + offset_x
+        centers_y = y[keep] + h[keep] // 2 + offset_y
+        return [(int(cx), int(cy), int(a)) for cx, cy, a in zip(centers_x, centers_y, area[keep])]
+    
     async def execute_decision(self, name: str, decision: str) -> bool:
         """Execute a pending decision for a member by finding them on page."""
         logger.info("Executing decision", name=name, decision=decision)
@@ -691,17 +847,30 @@ class GroupModerator:
     
     async def _take_screenshot(self, name: str) -> str:
         """Take a screenshot with timestamp for uniqueness."""
-        from datetime import datetime
-        os.makedirs(settings.screenshots_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%H%M%S")
         path = f"{settings.screenshots_dir}/{name}_{timestamp}.png"
         await self.page.screenshot(path=path)
         return path
     
+    async def _screenshot_bytes(self, debug_name: Optional[str] = None) -> bytes:
+        """Viewport screenshot as in-memory JPEG bytes.
+        
+        Also written to disk (with timestamp) as debug_name when debug_click_overlay is on.
+        """
+        raw = await self.page.screenshot(type="jpeg", quality=JPEG_QUALITY, full_page=False)
+        if debug_name and settings.debug_click_overlay:
+            timestamp = datetime.now().strftime("%H%M%S")
+            path = Path(settings.screenshots_dir) / f"{debug_name}_{timestamp}.jpg"
+            await asyncio.to_thread(path.write_bytes, raw)
+        return raw
+    
     async def _save_click_overlay(self, click_x: int, click_y: int, step_name: str, card_index: int = -1) -> Optional[str]:
         """
         Save a debug image showing where the click will happen.
         
+        Only the viewport capture happens before returning, so it still shows the
+        pre-click state; drawing, saving and AI validation run as a background task.
+        
         Args:
             click_x: X coordinate of the click (viewport coordinates)
             click_y: Y coordinate of the click (viewport coordinates)
@@ -709,7 +878,7 @@ class GroupModerator:
             card_index: Index of the card being processed (-1 if not applicable)
             
         Returns:
-            Path to the saved overlay image, or None if debug is disabled
+            Path the overlay image is written to, or None if debug is disabled
         """
         if not settings.debug_click_overlay:
             return None
@@ -720,19 +889,31 @@ class GroupModerator:
             
             # Build descriptive filename
             if card_index >= 0:
-                filename = f"debug_click_{timestamp}_card{card_index}_{step_name}.png"
+                filename = f"debug_click_{timestamp}_card{card_index}_{step_name}.jpg"
             else:
-                filename = f"debug_click_{timestamp}_{step_name}.png"
+                filename = f"debug_click_{timestamp}_{step_name}.jpg"
             
             filepath = f"{settings.screenshots_dir}/{filename}"
             
             # Take current viewport screenshot
-            await self.page.screenshot(path=filepath)
+            raw = await self.page.screenshot()
+            self._overlay_tasks.append(asyncio.create_task(
+                self._render_click_overlay(raw, filepath, click_x, click_y, step_name, card_index)
+            ))
+            return filepath
             
+        except Exception as e:
+            logger.error(f"Failed to save click overlay: {e}")
+            return None
+    
+    async def _render_click_overlay(self, raw: bytes, filepath: str, click_x: int, click_y: int,
+                                    step_name: str, card_index: int):
+        """Draw the click marker on a captured viewport, save it and start AI validation."""
+        try:
             # Load and draw overlay
-            img = cv2.imread(filepath)
+            img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
             if img is None:
-                return None
+                return
             
             # Draw large cross at click position
             cross_size = 30
@@ -750,38 +931,38 @@ class GroupModerator:
             
             # NO TEXT LABELS - just the marker to avoid AI confusion
             
-            # Save
-            cv2.imwrite(filepath, img)
-            logger.info(f"Debug overlay saved: {filename}")
-            
-            # AI validation of click position
-            await self._validate_click_with_ai(filepath, step_name, card_index)
+            # Encode once: the same JPEG bytes are saved and sent to the AI validator
+            ok, encoded = cv2.imencode(".jpg", img, JPEG_PARAMS)
+            if not ok:
+                return
+            image_bytes = encoded.tobytes()
+            await asyncio.to_thread(Path(filepath).write_bytes, image_bytes)
+            logger.info(f"Debug overlay saved: {os.path.basename(filepath)}")
             
-            return filepath
+            # AI validation of click position (only logs, so never wait for it)
+            task = asyncio.create_task(self._validate_click_with_ai(image_bytes, step_name, card_index))
+            self._validation_tasks.add(task)
+            task.add_done_callback(self._validation_tasks.discard)
             
         except Exception as e:
             logger.error(f"Failed to save click overlay: {e}")
-            return None
     
-    async def _validate_click_with_ai(self, overlay_path: str, expected_target: str, card_index: int):
+    async def _validate_click_with_ai(self, image_bytes: bytes, expected_target: str, card_index: int):
         """
         Use OpenRouter vision model to validate if the click overlay is correctly positioned.
         
         Args:
-            overlay_path: Path to the overlay image with red cross marker
+            image_bytes: JPEG-encoded overlay image with red cross marker
             expected_target: What we expect to click ('approve', 'decline', 'anteprima', 'confirm_decline')
             card_index: Index of the card being processed
         """
         # Skip if AI validation is disabled
         if not settings.debug_ai_validation:
             return
-        import base64
-        import httpx
         
         try:
-            # Read and encode image
-            with open(overlay_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode("utf-8")
+            # Encode image straight into the data URL (base64 is pure ASCII)
+            image_url = "data:image/jpeg;base64," + base64.b64encode(image_bytes).decode("ascii")
             
             # Build prompt based on expected target
             target_descriptions = {
@@ -809,46 +990,41 @@ Be very brief and direct."""
             logger.info(f"AI Validation - URL: {settings.openrouter_base_url}/chat/completions")
             logger.info(f"AI Validation - Model: {settings.openrouter_model}")
 
-            # Call OpenRouter
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{settings.openrouter_base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": settings.openrouter_model,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": [
-                                    {"type": "text", "text": prompt},
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {
-                                            "url": f"data:image/png;base64,{image_data}"
-                                        }
+            # Call OpenRouter (pooled connection)
+            response = await self.http_client.post(
+                "/chat/completions",
+                json={
+                    "model": settings.openrouter_model,
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": prompt},
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": image_url
                                     }
-                                ]
-                            }
-                        ],
-                        "max_tokens": 200
-                    }
-                )
+                                }
+                            ]
+                        }
+                    ],
+                    "max_tokens": 200
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                ai_answer = result["choices"][0]["message"]["content"]
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    ai_answer = result["choices"][0]["message"]["content"]
-                    
-                    # Log AI validation result
-                    logger.info("=" * 50)
-                    logger.info(f"AI CLICK VALIDATION - Card {card_index} - Target: {expected_target}")
-                    logger.info(f"AI Response: {ai_answer}")
-                    logger.info("=" * 50)
-                else:
-                    logger.warning(f"AI validation failed: HTTP {response.status_code}")
-                    logger.warning(f"Response body: {response.text[:500]}")
+                # Log AI validation result
+                logger.info("=" * 50)
+                logger.info(f"AI CLICK VALIDATION - Card {card_index} - Target: {expected_target}")
+                logger.info(f"AI Response: {ai_answer}")
+                logger.info("=" * 50)
+            else:
+                logger.warning(f"AI validation failed: HTTP {response.status_code}")
+                logger.warning(f"Response body: {response.text[:500]}")
                     
         except Exception as e:
             logger.warning(f"AI validation error (non-blocking): {e}")
@@ -860,7 +1036,7 @@ Be very brief and direct."""
         
         Args:
             card: The DetectedCard containing position info
-            ocr_texts: List of {'text': str, 'y': int, 'x': int, 'bbox': tuple} from OCR
+            ocr_texts: List of {'text': str, 'lower': str, 'y': int, 'x': int, 'bbox': tuple} from OCR
             
         Returns:
             Path to preview screenshot, or None if failed
@@ -868,25 +1044,18 @@ Be very brief and direct."""
         try:
             # Find "Anteprima" text position from OCR
             # Strategy: First look for STANDALONE "Anteprima" (better), then fall back to text containing it
-            anteprima_item = None
-            standalone_match = None
-            contains_match = None
-            
-            for t in ocr_texts:
-                text_lower = t['text'].lower().strip()
-                
-                # Priority 1: Standalone "Anteprima" (exact or nearly exact match)
-                if text_lower == 'anteprima' or text_lower in ['anteprima', 'anteprima.']:
-                    standalone_match = t
-                    logger.info(f"Found STANDALONE 'Anteprima': {t}")
-                    break
-                
+            # Priority 1: Standalone "Anteprima" (exact or nearly exact match)
+            standalone_match = next(
+                (t for t in ocr_texts if _ANTEPRIMA_STANDALONE_RE.fullmatch(t['lower'].strip())), None
+            )
+            if standalone_match:
+                logger.info("Found standalone 'Anteprima'", text=standalone_match['text'])
+                anteprima_item = standalone_match
+            else:
                 # Priority 2: Text containing "Anteprima"
-                if 'anteprima' in text_lower and not contains_match:
-                    contains_match = t
-                    logger.info(f"Found text CONTAINING 'Anteprima': {t['text']}")
-            
-            anteprima_item = standalone_match or contains_match
+                anteprima_item = next((t for t in ocr_texts if 'anteprima' in t['lower']), None)
+                if anteprima_item:
+                    logger.info("Found text containing 'Anteprima'", text=anteprima_item['text'])
             
             if not anteprima_item:
                 return None
@@ -898,12 +1067,8 @@ Be very brief and direct."""
             # IMPORTANT: "Anteprima" is at the END of the text like "Ha inviato un post. Anteprima"
             # So we need to click on the RIGHT side of the bbox, not the center!
             bbox = anteprima_item.get('bbox')
-            logger.info(f"Anteprima OCR bbox: {bbox}")
-            logger.info(f"Anteprima text: '{anteprima_item.get('text')}'")
-            
-            # Check if this is a standalone or contained match
-            is_standalone = (standalone_match is not None)
-            logger.info(f"Match type: {'STANDALONE' if is_standalone else 'CONTAINED'}")
+            logger.info("Anteprima OCR match", bbox=bbox, text=anteprima_item.get('text'),
+                       standalone=standalone_match is not None)
             
             if bbox:
                 # Click on the RIGHT part of the bbox where "Anteprima" word is
@@ -912,25 +1077,21 @@ Be very brief and direct."""
                 
                 # Y: center of bbox (no offset - both standalone and contained)
                 rel_y = (bbox[1] + bbox[3]) // 2
-                logger.info(f"Using center Y of bbox")
-                
-                logger.info(f"Using RIGHT side of bbox: x={bbox[2]} - 35 = {rel_x}")
             else:
                 # Fallback: use approximate position
                 rel_x = int(card.width * 0.35)  # Anteprima is typically left-center
                 rel_y = anteprima_item['y']
             
-            logger.info(f"Card dimensions: {card.width}x{card.height}")
-            logger.info(f"Relative coords in card: ({rel_x}, {rel_y})")
+            logger.debug("Anteprima coords in card", card_width=card.width, card_height=card.height,
+                         rel_x=rel_x, rel_y=rel_y)
             
             # Convert to absolute page coordinates using same method as buttons
             # This uses SIDEBAR_WIDTH (360) which is correct for fullpage coordinate system
             abs_x, abs_y = self.card_detector.get_absolute_coords(card, rel_x, rel_y)
-            logger.info(f"Absolute page coords: ({abs_x}, {abs_y})")
+            logger.debug("Anteprima page coords", x=abs_x, y=abs_y)
             
             # Get viewport dimensions for scroll calculation
-            viewport = self.page.viewport_size
-            viewport_height = viewport["height"] if viewport else 864
+            viewport_height = self.viewport_height
             
             # Scroll card into view if needed
             scroll_to_y = max(0, abs_y - viewport_height // 2)
@@ -938,17 +1099,21 @@ Be very brief and direct."""
             await self.human.random_delay(0.3, 0.5)
             
             # Get ACTUAL scroll position (browser clamps if page is shorter than requested)
-            actual_scroll_y = await self.page.evaluate("window.scrollY")
+            actual_scroll_y = await self._actual_scroll_y(scroll_to_y, viewport_height)
             
             # Adjust Y for viewport using ACTUAL scroll position
             viewport_y = abs_y - actual_scroll_y
             
-            logger.info(f"Scroll requested: {scroll_to_y}, actual: {actual_scroll_y}")
-            logger.info(f"After scroll: viewport coords ({abs_x}, {viewport_y})")
+            logger.info("Scrolled to Anteprima", requested=scroll_to_y, actual=actual_scroll_y,
+                       x=abs_x, viewport_y=viewport_y)
             
             # Save debug overlay before click
             await self._save_click_overlay(abs_x, viewport_y, "anteprima", card.card_index)
             
+            # Dialogs already open (Messenger, cookies...); the preview is the next one added
+            dialogs = self.page.locator('div[role="dialog"]')
+            preview_dialog = dialogs.nth(await dialogs.count())
+            
             await self.human.human_click(abs_x, viewport_y)
             
             # Wait for popup to appear - give it enough time!
@@ -957,18 +1122,18 @@ Be very brief and direct."""
             
             # Take screenshot of the popup with unique name
             preview_path = await self._take_screenshot(f"preview_card_{card.card_index}")
-            logger.info(f"Preview captured: {preview_path}")
+            logger.info("Preview captured", path=preview_path)
             
-            # Close popup - try multiple methods
-            # Method 1: Press Escape multiple times
-            await self.page.keyboard.press("Escape")
-            await self.human.random_delay(0.5, 0.8)
+            # Close popup - Escape, then wait for the preview dialog to go away
             await self.page.keyboard.press("Escape")
-            await self.human.random_delay(0.5, 0.8)
-            
-            # Method 2: Click outside the popup (far left of page)
-            await self.page.mouse.click(50, 400)
-            await self.human.random_delay(1.0, 1.5)
+            try:
+                await preview_dialog.wait_for(state="hidden", timeout=1500)
+            except PlaywrightTimeoutError:
+                # Still open: Escape again and click outside the popup (far left of page)
+                logger.info("Popup still open after Escape, clicking outside")
+                await self.page.keyboard.press("Escape")
+                await self.page.mouse.click(50, 400)
+                await self.human.random_delay(1.0, 1.5)
             
             logger.info("Popup closed, returning to cards")
             return preview_path
@@ -984,53 +1149,48 @@ Be very brief and direct."""
                 pass
             return None
     
-    def _crop_card_to_text_bbox(self, card_image_path: str, ocr_texts: list, padding: int = 20) -> str:
+    def _crop_card_to_text_bbox(self, card: DetectedCard, ocr_texts: list, padding: int = 20) -> str:
         """
         Crop card image to the bounding box of all OCR text, plus padding.
         
         Args:
-            card_image_path: Path to the original card image
-            ocr_texts: List of {'text': str, 'bbox': [x1, y1, x2, y2]} from OCR
+            card: Detected card, cropped from its in-memory image_array
+            ocr_texts: List of {'text': str, 'lower': str, 'bbox': [x1, y1, x2, y2]} from OCR
             padding: Pixels to add around the text bbox
             
         Returns:
-            Path to the cropped image (or original if crop fails)
+            Path to the cropped image (or the full card image if crop fails)
         """
         try:
             # Filter to get only text elements with valid bbox (exclude buttons)
             text_bboxes = []
             for t in ocr_texts:
                 bbox = t.get('bbox')
-                text_lower = t['text'].lower()
                 # Exclude UI buttons from bbox calculation
-                if bbox and not any(ui in text_lower for ui in ['approva', 'rifiuta', '•••']):
+                if bbox and not _CROP_EXCLUDE_RE.search(t['lower']):
                     text_bboxes.append(bbox)
             
             if not text_bboxes:
                 logger.warning("No text bboxes found for cropping")
-                return card_image_path
+                cv2.imwrite(card.image_path, card.image_array, JPEG_PARAMS)
+                return card.image_path
             
-            # Calculate bounding box of all text
-            min_x = min(b[0] for b in text_bboxes)
-            min_y = min(b[1] for b in text_bboxes)
-            max_x = max(b[2] for b in text_bboxes)
-            max_y = max(b[3] for b in text_bboxes)
+            # Calculate bounding box of all text (one (N, 4) reduction)
+            boxes = np.asarray(text_bboxes, dtype=np.int32)
+            min_x, min_y = boxes[:, :2].min(axis=0)
+            max_x, max_y = boxes[:, 2:].max(axis=0)
             
             # Add padding
-            img = Image.open(card_image_path)
-            img_width, img_height = img.size
+            img_height, img_width = card.image_array.shape[:2]
             
             crop_left = max(0, int(min_x) - padding)
             crop_top = max(0, int(min_y) - padding)
             crop_right = min(img_width, int(max_x) + padding)
             crop_bottom = min(img_height, int(max_y) + padding)
             
-            # Crop
-            cropped = img.crop((crop_left, crop_top, crop_right, crop_bottom))
-            
-            # Save to new file
-            cropped_path = card_image_path.replace('.png', '_cropped.png')
-            cropped.save(cropped_path)
+            # Crop (NumPy view) and encode once
+            cropped_path = card.image_path.replace('.jpg', '_cropped.jpg')
+            cv2.imwrite(cropped_path, card.image_array[crop_top:crop_bottom, crop_left:crop_right], JPEG_PARAMS)
             
             logger.info(f"Card cropped to text bbox: ({crop_left}, {crop_top}) - ({crop_right}, {crop_bottom})")
             
@@ -1038,5 +1198,6 @@ Be very brief and direct."""
             
         except Exception as e:
             logger.error(f"Failed to crop card to text bbox: {e}")
-            return card_image_path
+            cv2.imwrite(card.image_path, card.image_array, JPEG_PARAMS)
+            return card.image_path
 
@@ -1,80 +1,132 @@
 """Human-like behavior simulation for browser automation - ASYNC version with advanced patterns."""
 import asyncio
-import random
 import math
-from typing import Tuple, List
-from playwright.async_api import Page
+from collections import deque
+from typing import Dict, Tuple, List, Union, Optional
+from playwright.async_api import Page, Locator, CDPSession
+import numpy as np
 import structlog
 
+from src.config import settings
+
 logger = structlog.get_logger()
 
+_POOL_SIZE = 4096
+_NORMAL_POOL: deque = deque()  # pre-drawn standard normals, refilled in batches
+_UNIFORM_POOL: deque = deque()  # pre-drawn uniforms in [0, 1), refilled in batches
+_rng = np.random.default_rng()
+
+
+def _refill_pool():
+    """Draw a fresh batch of standard normals into the pool."""
+    _NORMAL_POOL.extend(_rng.standard_normal(_POOL_SIZE).tolist())
+
+
+def _random() -> float:
+    """Uniform float in [0, 1) from the pre-drawn pool."""
+    if not _UNIFORM_POOL:
+        _UNIFORM_POOL.extend(_rng.random(_POOL_SIZE).tolist())
+    return _UNIFORM_POOL.popleft()
+
+
+def _uniform(low: float, high: float) -> float:
+    """Uniform float in [low, high)."""
+    return low + (high - low) * _random()
+
+
+def _randint(low: int, high: int) -> int:
+    """Uniform int in [low, high], both ends inclusive like random.randint."""
+    return low + int((high - low + 1) * _random())
+
+
+def _choice(seq):
+    """Uniformly chosen element of a non-empty sequence."""
+    return seq[int(len(seq) * _random())]
+
 
 def gaussian_random(mean: float, std: float, min_val: float = 0.1) -> float:
     """Generate gaussian-distributed random number with minimum floor."""
-    # Box-Muller transform for gaussian distribution
-    u1 = random.random()
-    u2 = random.random()
-    z = math.sqrt(-2 * math.log(u1)) * math.cos(2 * math.pi * u2)
-    value = mean + z * std
+    if not _NORMAL_POOL:
+        _refill_pool()
+    value = mean + _NORMAL_POOL.popleft() * std
     return max(min_val, value)
 
 
-def bezier_point(t: float, p0: Tuple[float, float], p1: Tuple[float, float], 
-                 p2: Tuple[float, float], p3: Tuple[float, float]) -> Tuple[float, float]:
-    """Calculate point on cubic Bézier curve at parameter t."""
-    x = (1-t)**3 * p0[0] + 3*(1-t)**2*t * p1[0] + 3*(1-t)*t**2 * p2[0] + t**3 * p3[0]
-    y = (1-t)**3 * p0[1] + 3*(1-t)**2*t * p1[1] + 3*(1-t)*t**2 * p2[1] + t**3 * p3[1]
-    return (x, y)
+_BASIS_CACHE: Dict[int, np.ndarray] = {}  # num_points -> eased cubic Bernstein basis
+# Path length range used by _move_mouse_bezier (bases for these are prebuilt at import)
+MIN_PATH_POINTS = 8
+MAX_PATH_POINTS = 25
+
+
+def _bernstein_basis(num_points: int) -> np.ndarray:
+    """(num_points, 4) cubic Bernstein basis over ease-in-out warped t, cached per size."""
+    basis = _BASIS_CACHE.get(num_points)
+    if basis is None:
+        linear_t = np.linspace(0.0, 1.0, num_points)
+        # Ease-in-out cubic: more points at start (acceleration) and end (deceleration)
+        t = np.where(linear_t < 0.5, 4 * linear_t ** 3, 1 - (-2 * linear_t + 2) ** 3 / 2)
+        u = 1 - t
+        uu, tt = u * u, t * t  # Shared squares, no repeated powers
+        basis = np.stack([uu * u, 3 * uu * t, 3 * u * tt, tt * t], axis=1)
+        _BASIS_CACHE[num_points] = basis
+    return basis
+
+
+def _prebuild_bases() -> None:
+    """Fill _BASIS_CACHE for every path length _move_mouse_bezier can pick."""
+    for num_points in range(MIN_PATH_POINTS, MAX_PATH_POINTS + 1):
+        _bernstein_basis(num_points)
+
+
+_prebuild_bases()
 
 
 def generate_bezier_path(start: Tuple[int, int], end: Tuple[int, int], 
                          num_points: int = 15) -> List[Tuple[int, int]]:
     """Generate a natural curved mouse path using Bézier curve."""
-    # Calculate distance and direction
-    dx = end[0] - start[0]
-    dy = end[1] - start[1]
-    distance = math.sqrt(dx*dx + dy*dy)
+    # Points as complex x + yj: one expression per point instead of one per coordinate
+    p0 = complex(*start)
+    p3 = complex(*end)
+    delta = p3 - p0
+    distance = abs(delta)
     
     # Generate control points with some randomness
     # Control points create the curve shape
     offset_range = distance * 0.3  # 30% of distance for curve amplitude
     
-    # Random perpendicular offset for natural curves
-    perpendicular = (dy / (distance + 0.001), -dx / (distance + 0.001))
-    
-    p0 = (float(start[0]), float(start[1]))
-    p3 = (float(end[0]), float(end[1]))
+    # Random perpendicular offset for natural curves (direction rotated by -90°)
+    perpendicular = -1j * delta / (distance + 0.001)
     
     # Control point 1: about 1/3 of the way with curve offset
-    curve_offset_1 = random.uniform(-offset_range, offset_range)
-    p1 = (
-        start[0] + dx * 0.3 + perpendicular[0] * curve_offset_1,
-        start[1] + dy * 0.3 + perpendicular[1] * curve_offset_1
-    )
+    curve_offset_1 = _uniform(-offset_range, offset_range)
+    p1 = p0 + delta * 0.3 + perpendicular * curve_offset_1
     
     # Control point 2: about 2/3 of the way with different offset
-    curve_offset_2 = random.uniform(-offset_range * 0.5, offset_range * 0.5)
-    p2 = (
-        start[0] + dx * 0.7 + perpendicular[0] * curve_offset_2,
-        start[1] + dy * 0.7 + perpendicular[1] * curve_offset_2
-    )
+    curve_offset_2 = _uniform(-offset_range * 0.5, offset_range * 0.5)
+    p2 = p0 + delta * 0.7 + perpendicular * curve_offset_2
     
-    # Generate points along the curve with variable density
-    # More points at start (acceleration) and end (deceleration)
-    path = []
-    for i in range(num_points):
-        # Non-linear t for ease-in-out effect
-        linear_t = i / (num_points - 1)
-        # Ease-in-out cubic
-        if linear_t < 0.5:
-            t = 4 * linear_t * linear_t * linear_t
-        else:
-            t = 1 - pow(-2 * linear_t + 2, 3) / 2
-        
-        point = bezier_point(t, p0, p1, p2, p3)
-        path.append((int(point[0]), int(point[1])))
+    # Generate points along the curve with variable density:
+    # eased basis (N, 4) times complex control points (4,)
+    points = _bernstein_basis(num_points) @ np.array([p0, p1, p2, p3])
     
-    return path
+    return list(zip(points.real.astype(int).tolist(), points.imag.astype(int).tolist()))
+
+
+# Per-keystroke delay range (ms) by character class
+_TYPING_DELAYS = {
+    "space": (80, 200),   # Longer for spaces
+    "upper": (100, 180),  # Longer for uppercase (shift key)
+    "other": (40, 120),
+}
+
+
+def _typing_class(char: str) -> str:
+    """Typing speed class of a character (key into _TYPING_DELAYS)."""
+    if char in ' \n\t':
+        return "space"
+    if char.isupper():
+        return "upper"
+    return "other"
 
 
 class HumanBehavior:
@@ -83,6 +135,18 @@ class HumanBehavior:
     def __init__(self, page: Page):
         self.page = page
         self._last_position = None
+        self._cdp: Optional[CDPSession] = None  # Chromium session for pipelined mouse moves
+        self._cdp_failed = False
+    
+    async def _get_cdp(self) -> Optional[CDPSession]:
+        """CDP session for raw input events, created once (None if unavailable)."""
+        if self._cdp is None and not self._cdp_failed:
+            try:
+                self._cdp = await self.page.context.new_cdp_session(self.page)
+            except Exception as e:
+                self._cdp_failed = True
+                logger.debug("CDP session unavailable, using page.mouse", error=str(e))
+        return self._cdp
     
     async def random_delay(self, min_sec: float = 0.5, max_sec: float = 2.0, use_gaussian: bool = True):
         """Wait for a random amount of time with gaussian or uniform distribution."""
@@ -93,7 +157,7 @@ class HumanBehavior:
             delay = gaussian_random(mean, std, min_sec)
             delay = min(delay, max_sec * 1.2)  # Cap at 120% of max
         else:
-            delay = random.uniform(min_sec, max_sec)
+            delay = _uniform(min_sec, max_sec)
         
         await asyncio.sleep(delay)
 
@@ -103,38 +167,52 @@ class HumanBehavior:
     
     async def thinking_pause(self):
         """Simulate occasional thinking pauses that humans naturally have."""
-        if random.random() < 0.15:  # 15% chance of thinking pause
+        if _random() < 0.15:  # 15% chance of thinking pause
             pause_duration = gaussian_random(2.0, 1.0, 0.5)
-            logger.debug("Thinking pause", duration=f"{pause_duration:.2f}s")
+            logger.debug("Thinking pause", duration=round(pause_duration, 2))
             await asyncio.sleep(pause_duration)
     
-    async def human_type(self, selector: str, text: str):
-        """Type text with human-like delays between keystrokes."""
-        element = self.page.locator(selector)
-        await element.click()
+    async def human_type(self, target: Union[str, Locator], text: str, timeout: Optional[float] = None):
+        """Type text with human-like delays between keystrokes.
+        
+        Accepts an already-resolved Locator (preferred) or a selector string.
+        timeout (ms) bounds the initial click; Playwright raises TimeoutError
+        if the field never becomes actionable.
+        """
+        element = self.page.locator(target) if isinstance(target, str) else target
+        await element.click(timeout=timeout)
         await self.random_delay(0.2, 0.5)
         
-        for i, char in enumerate(text):
-            # Variable typing speed based on character
-            if char in ' \n\t':
-                delay = random.randint(80, 200)  # Longer for spaces
-            elif char.isupper():
-                delay = random.randint(100, 180)  # Longer for uppercase (shift key)
-            else:
-                delay = random.randint(40, 120)
+        # Type runs of same-speed characters in one driver call; randomness
+        # is kept at run boundaries and pause/burst events
+        # Pause/burst events for every position drawn up front in one batch
+        events = _rng.random((2, len(text)))
+        pauses = (events[0] < 0.08).tolist()  # Occasional longer pause (reading/thinking)
+        bursts = (events[1] < 0.05).tolist()  # Small chance of faster burst typing
+        
+        run_start = 0
+        i = 0
+        while i < len(text):
+            char_class = _typing_class(text[i])
+            pause, burst = pauses[i], bursts[i]
+            run_ends = i + 1 == len(text) or _typing_class(text[i + 1]) != char_class
+            i += 1
             
-            await element.type(char, delay=delay)
+            if not (pause or burst or run_ends):
+                continue
             
-            # Occasional longer pause (simulating reading/thinking)
-            if random.random() < 0.08:  # 8% chance
+            low, high = _TYPING_DELAYS[char_class]
+            await element.press_sequentially(text[run_start:i], delay=_randint(low, high))
+            
+            if pause:
                 await self.random_delay(0.3, 0.8)
             
-            # Small chance of faster burst typing
-            if random.random() < 0.05:  # 5% chance of speed burst
-                for _ in range(min(3, len(text) - i - 1)):
-                    if i + 1 < len(text):
-                        await element.type(text[i+1], delay=random.randint(20, 50))
-                        i += 1
+            if burst and i < len(text):
+                burst_end = min(i + 3, len(text))
+                await element.press_sequentially(text[i:burst_end], delay=_randint(20, 50))
+                i = burst_end
+            
+            run_start = i
     
     async def human_click(self, x: int, y: int):
         """Click at coordinates with natural movement and randomization."""
@@ -152,7 +230,7 @@ class HumanBehavior:
         await self.random_delay(0.08, 0.25)
         
         # Variable click duration
-        click_delay = random.randint(50, 150)
+        click_delay = _randint(50, 150)
         await self.page.mouse.click(final_x, final_y, delay=click_delay)
         
         # Update last position
@@ -172,30 +250,50 @@ class HumanBehavior:
             start_x, start_y = self._last_position
         else:
             # Start from random position near center if unknown
-            start_x = viewport["width"] // 2 + random.randint(-100, 100)
-            start_y = viewport["height"] // 2 + random.randint(-100, 100)
+            start_x = viewport["width"] // 2 + _randint(-100, 100)
+            start_y = viewport["height"] // 2 + _randint(-100, 100)
         
         # Calculate distance
-        distance = math.sqrt((target_x - start_x)**2 + (target_y - start_y)**2)
+        distance = math.hypot(target_x - start_x, target_y - start_y)
         
         # Number of points based on distance (more for longer distances)
-        num_points = max(8, min(25, int(distance / 30)))
+        num_points = max(MIN_PATH_POINTS, min(MAX_PATH_POINTS, int(distance / 30)))
         
         # Generate Bézier path
         path = generate_bezier_path((start_x, start_y), (target_x, target_y), num_points)
         
-        # Move along path with variable speed
-        for i, (x, y) in enumerate(path):
-            await self.page.mouse.move(x, y)
-            
-            # Variable delay - slower at start and end (acceleration/deceleration)
-            progress = i / len(path)
-            if progress < 0.2 or progress > 0.8:
-                delay = random.uniform(0.02, 0.05)  # Slower at edges
+        # Variable delay after each point - slower at start and end (acceleration/deceleration)
+        n = len(path)
+        progress = np.arange(n) / n
+        delays = np.where((progress < 0.2) | (progress > 0.8),
+                          _rng.uniform(0.02, 0.05, n),     # Slower at edges
+                          _rng.uniform(0.008, 0.025, n))  # Faster in middle
+        
+        # Schedule every move at its cumulative time on the loop and sleep once,
+        # instead of one await + sleep per point. With CDP the events are sent
+        # without waiting for each ack
+        cdp = await self._get_cdp()
+        loop = asyncio.get_running_loop()
+        moves = []
+        
+        def dispatch(x: int, y: int):
+            if cdp:
+                moves.append(asyncio.ensure_future(cdp.send(
+                    "Input.dispatchMouseEvent", {"type": "mouseMoved", "x": x, "y": y}
+                )))
             else:
-                delay = random.uniform(0.008, 0.025)  # Faster in middle
-            
-            await asyncio.sleep(delay)
+                moves.append(asyncio.ensure_future(self.page.mouse.move(x, y)))
+        
+        start_time = loop.time()
+        offsets = np.concatenate(([0.0], np.cumsum(delays)[:-1])).tolist()
+        handles = [loop.call_at(start_time + offset, dispatch, x, y)
+                   for (x, y), offset in zip(path, offsets)]
+        try:
+            await asyncio.sleep(float(delays.sum()))
+        finally:
+            for handle in handles:
+                handle.cancel()
+        await asyncio.gather(*moves)
     
     async def _move_mouse_natural(self, target_x: int, target_y: int):
         """Legacy method - now wraps Bézier movement."""
@@ -211,18 +309,24 @@ class HumanBehavior:
         else:
             delta = -amount
         
-        # Scroll in small increments with variable sizes
-        remaining = abs(delta)
-        sign = 1 if delta > 0 else -1
-        
-        while remaining > 0:
-            # Random chunk size (60-150 pixels)
-            chunk = min(remaining, int(gaussian_random(90, 30, 40)))
-            await self.page.mouse.wheel(0, sign * chunk)
-            remaining -= chunk
+        if not settings.realistic_scroll:
+            # One native smooth scroll, waiting about as long as the chunked version would
+            await self.page.evaluate("(d) => window.scrollBy({top: d, behavior: 'smooth'})", delta)
+            chunks = max(1, round(amount / 90))
+            await self.random_delay(chunks * 0.03, chunks * 0.12)
+        else:
+            # Scroll in small increments with variable sizes
+            remaining = abs(delta)
+            sign = 1 if delta > 0 else -1
             
-            # Variable delay between scroll chunks
-            await self.random_delay(0.03, 0.12, use_gaussian=True)
+            while remaining > 0:
+                # Random chunk size (60-150 pixels)
+                chunk = min(remaining, int(gaussian_random(90, 30, 40)))
+                await self.page.mouse.wheel(0, sign * chunk)
+                remaining -= chunk
+                
+                # Variable delay between scroll chunks
+                await self.random_delay(0.03, 0.12, use_gaussian=True)
         
         logger.info("Human scroll performed", direction=direction, amount=amount)
         
@@ -234,19 +338,19 @@ class HumanBehavior:
         viewport = self.page.viewport_size
         
         # Random number of "look around" actions
-        for _ in range(random.randint(2, 4)):
+        for _ in range(_randint(2, 4)):
             # Move to random position (avoid edges)
             margin = 150
-            x = random.randint(margin, viewport["width"] - margin)
-            y = random.randint(margin, viewport["height"] - margin)
+            x = _randint(margin, viewport["width"] - margin)
+            y = _randint(margin, viewport["height"] - margin)
             await self._move_mouse_bezier(x, y)
             
             await self.random_delay(0.3, 0.8)
             
             # Maybe scroll a bit
-            if random.random() < 0.3:
-                direction = random.choice(["up", "down"])
-                await self.human_scroll(direction, random.randint(50, 150))
+            if _random() < 0.3:
+                direction = _choice(["up", "down"])
+                await self.human_scroll(direction, _randint(50, 150))
     
     async def micro_movements(self):
         """Small micro-movements that humans naturally make."""
@@ -256,11 +360,11 @@ class HumanBehavior:
         x, y = self._last_position
         
         # Small random movements (1-5 pixels)
-        for _ in range(random.randint(1, 3)):
-            dx = random.randint(-5, 5)
-            dy = random.randint(-5, 5)
+        for _ in range(_randint(1, 3)):
+            dx = _randint(-5, 5)
+            dy = _randint(-5, 5)
             await self.page.mouse.move(x + dx, y + dy)
-            await asyncio.sleep(random.uniform(0.05, 0.15))
+            await asyncio.sleep(_uniform(0.05, 0.15))
         
         # Return to original position
         await self.page.mouse.move(x, y)
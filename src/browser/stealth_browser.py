@@ -1,10 +1,13 @@
 """Stealth browser implementation with advanced anti-detection measures - ASYNC version."""
+import asyncio
+import inspect
 import os
+import re
 import json
 import random
 import hashlib
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Set
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 import structlog
 
@@ -13,6 +16,35 @@ from src.config import settings
 logger = structlog.get_logger()
 
 
+class _NoStackInspect:
+    """inspect stand-in for Playwright's connection module with a free stack()."""
+    
+    @staticmethod
+    def stack(context: int = 1) -> list:
+        return []
+    
+    def __getattr__(self, name):
+        return getattr(inspect, name)
+
+
+def _disable_playwright_stack_capture():
+    """Skip the inspect.stack() Playwright takes on every API call (debug metadata only).
+    
+    Opt-in: only applied when PW_INSPECT_STACK=0 is set explicitly, since it
+    replaces a private Playwright module attribute.
+    """
+    if os.environ.get("PW_INSPECT_STACK") != "0":
+        return
+    try:
+        from playwright._impl import _connection
+        _connection.inspect = _NoStackInspect()
+    except (ImportError, AttributeError) as e:
+        logger.warning("Could not patch Playwright stack capture", error=str(e))
+
+
+_disable_playwright_stack_capture()
+
+
 # Updated User Agents (Chrome 131+, Firefox 133+, Edge - December 2024)
 USER_AGENTS = [
     # Chrome Windows
@@ -48,12 +80,114 @@ BLOCKED_DOMAINS = [
     "**/kasada.io/**",
 ]
 
+# All BLOCKED_DOMAINS globs as one pattern, so a single route handler matches them
+BLOCKED_URL_RE = re.compile(
+    "/(?:" + "|".join(re.escape(p[len("**/"):-len("/**")]) for p in BLOCKED_DOMAINS) + ")/"
+)
+
+
+SCREENSHOT_JPEG_QUALITY = 70  # Diagnostic screenshots only, lossless not needed
+
+# Chromium launch flags (shared browser, see BrowserPool)
+LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-infobars",
+    "--window-size=1920,1080",
+    "--start-maximized",
+    "--ignore-certificate-errors",
+    "--disable-extensions",
+    "--no-first-run",
+    "--disable-background-networking",
+    "--disable-breakpad",
+    "--disable-component-update",
+    "--disable-domain-reliability",
+    "--disable-features=AudioServiceOutOfProcess,IsolateOrigins,site-per-process",
+    "--disable-hang-monitor",
+    "--disable-ipc-flooding-protection",
+    "--disable-popup-blocking",
+    "--disable-prompt-on-repost",
+    "--disable-renderer-backgrounding",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--safebrowsing-disable-auto-update",
+    # GPU args for consistent fingerprint
+    "--enable-webgl",
+    "--use-gl=angle",
+    "--use-angle=default",
+]
+
+
+class BrowserPool:
+    """Process-wide Playwright + Chromium shared by every StealthBrowser.
+    
+    Each StealthBrowser only opens its own (cheap) context; the browser
+    stays up until shutdown().
+    """
+    
+    _playwright = None
+    _browser: Optional[Browser] = None
+    _lock: Optional[asyncio.Lock] = None
+    
+    @classmethod
+    async def get_browser(cls) -> Browser:
+        """Shared browser, launched on first use (or after it disconnected)."""
+        if cls._browser and cls._browser.is_connected():
+            return cls._browser
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            if cls._browser and cls._browser.is_connected():
+                return cls._browser
+            if cls._playwright is None:
+                cls._playwright = await async_playwright().start()
+            if settings.cdp_endpoint:
+                # Long-lived external Chrome: no launch cost, its process outlives us
+                logger.info("Connecting to browser over CDP", endpoint=settings.cdp_endpoint)
+                cls._browser = await cls._playwright.chromium.connect_over_cdp(
+                    settings.cdp_endpoint,
+                    slow_mo=settings.slow_mo
+                )
+            else:
+                logger.info("Launching shared browser")
+                cls._browser = await cls._playwright.chromium.launch(
+                    headless=settings.headless,
+                    slow_mo=settings.slow_mo,
+                    args=LAUNCH_ARGS
+                )
+            return cls._browser
+    
+    @classmethod
+    async def shutdown(cls):
+        """Close the shared browser and stop Playwright (process exit, night mode).
+        
+        A CDP-connected browser is only disconnected; the external Chrome keeps running.
+        """
+        try:
+            if cls._browser:
+                await cls._browser.close()
+        except Exception as e:
+            logger.warning("Error closing browser", error=str(e))
+        try:
+            if cls._playwright:
+                await cls._playwright.stop()
+        except Exception as e:
+            logger.warning("Error stopping playwright", error=str(e))
+        cls._browser = None
+        cls._playwright = None
+
 
 class StealthBrowser:
     """Browser with advanced stealth mode to avoid detection - ASYNC version."""
     
+    _script_cache: Dict[str, str] = {}  # fingerprint hash -> generated stealth script
+    _fingerprint_cache: Dict[str, dict] = {}  # fingerprint file path -> loaded fingerprint
+    _mkdir_cache: Set[str] = set()  # directories already created this process
+    
     def __init__(self):
-        self._playwright = None
         self._browser: Optional[Browser] = None
         self._context: Optional[BrowserContext] = None
         self._page: Optional[Page] = None
@@ -61,8 +195,27 @@ class StealthBrowser:
         self._fingerprint_path = Path(settings.sessions_dir) / "fingerprint.json"
         self._fingerprint: dict = {}
         
+    @classmethod
+    def _ensure_dir(cls, path) -> None:
+        """os.makedirs(path, exist_ok=True), once per directory per process."""
+        key = str(path)
+        if key not in cls._mkdir_cache:
+            os.makedirs(key, exist_ok=True)
+            cls._mkdir_cache.add(key)
+    
     def _load_or_create_fingerprint(self) -> dict:
-        """Load existing fingerprint or create a new persistent one."""
+        """Load existing fingerprint or create a new persistent one (disk is read once per process)."""
+        cache_key = str(self._fingerprint_path)
+        cached = StealthBrowser._fingerprint_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        fingerprint = self._read_or_create_fingerprint()
+        StealthBrowser._fingerprint_cache[cache_key] = fingerprint
+        return fingerprint
+    
+    def _read_or_create_fingerprint(self) -> dict:
+        """Read the fingerprint file, or generate and save a new one."""
         if self._fingerprint_path.exists():
             try:
                 with open(self._fingerprint_path, 'r') as f:
@@ -93,16 +246,30 @@ class StealthBrowser:
         }
         
         # Save fingerprint
-        os.makedirs(self._fingerprint_path.parent, exist_ok=True)
+        self._ensure_dir(self._fingerprint_path.parent)
         with open(self._fingerprint_path, 'w') as f:
             json.dump(fingerprint, f, indent=2)
         
         logger.info("Created new fingerprint", user_agent=fingerprint['user_agent'][:50])
         return fingerprint
     
-    def _get_stealth_scripts(self) -> str:
+    def _fingerprint_hash(self) -> str:
+        """Stable md5 of the current fingerprint."""
+        return hashlib.md5(json.dumps(self._fingerprint, sort_keys=True).encode()).hexdigest()
+    
+    def _get_stealth_scripts(self, fingerprint_hash: str) -> str:
+        """Anti-detection JavaScript for the current fingerprint, built once per fingerprint."""
+        script = StealthBrowser._script_cache.get(fingerprint_hash)
+        if script is None:
+            script = self._build_stealth_scripts()
+            StealthBrowser._script_cache[fingerprint_hash] = script
+        return script
+    
+    def _build_stealth_scripts(self) -> str:
         """Generate comprehensive anti-detection JavaScript."""
         fp = self._fingerprint
+        languages_js = json.dumps(fp.get('languages', ['it-IT', 'it', 'en']))
+        viewport_js = json.dumps(fp.get('viewport', {'width': 1920, 'height': 1080}))
         
         return f"""
         // ===== NAVIGATOR PROPERTIES =====
@@ -129,7 +296,7 @@ class StealthBrowser:
         
         // Languages
         Object.defineProperty(navigator, 'languages', {{
-            get: () => {json.dumps(fp.get('languages', ['it-IT', 'it', 'en']))}
+            get: () => {languages_js}
         }});
         
         // ===== PLUGINS (realistic browser plugins) =====
@@ -207,19 +374,26 @@ class StealthBrowser:
         // ===== CANVAS FINGERPRINT NOISE =====
         const canvasNoise = {fp.get('canvas_noise', 0.0005)};
         
+        // Noise of +-amp/2 can only change a byte if amp >= 1 (Uint8ClampedArray rounds)
+        const canvasNoiseAmp = canvasNoise * 255;
         const originalToDataURL = HTMLCanvasElement.prototype.toDataURL;
         HTMLCanvasElement.prototype.toDataURL = function(type) {{
-            if (type === 'image/png' || type === undefined) {{
+            if ((type === 'image/png' || type === undefined) && canvasNoiseAmp >= 1) {{
                 const canvas = this;
                 const ctx = canvas.getContext('2d');
                 if (ctx && canvas.width > 0 && canvas.height > 0) {{
                     try {{
                         const imageData = ctx.getImageData(0, 0, canvas.width, canvas.height);
-                        for (let i = 0; i < imageData.data.length; i += 4) {{
-                            // Add subtle noise to RGB channels
-                            imageData.data[i] = Math.max(0, Math.min(255, imageData.data[i] + (Math.random() - 0.5) * canvasNoise * 255));
-                            imageData.data[i+1] = Math.max(0, Math.min(255, imageData.data[i+1] + (Math.random() - 0.5) * canvasNoise * 255));
-                            imageData.data[i+2] = Math.max(0, Math.min(255, imageData.data[i+2] + (Math.random() - 0.5) * canvasNoise * 255));
+                        const data = imageData.data;
+                        // xorshift32 seeded once per call instead of Math.random() per channel
+                        let seed = (Math.random() * 0xFFFFFFFF) | 1;
+                        const scale = canvasNoiseAmp / 0x100000000;
+                        for (let i = 0; i < data.length; i += 4) {{
+                            // Add subtle noise to RGB channels (clamped array clamps to 0..255)
+                            for (let c = i; c < i + 3; c++) {{
+                                seed ^= seed << 13; seed ^= seed >>> 17; seed ^= seed << 5;
+                                data[c] += (seed >>> 0) * scale - canvasNoiseAmp / 2;
+                            }}
                         }}
                         ctx.putImageData(imageData, 0, 0);
                     }} catch(e) {{}}
@@ -258,7 +432,7 @@ class StealthBrowser:
         }});
         
         // ===== SCREEN PROPERTIES =====
-        const viewport = {json.dumps(fp.get('viewport', {'width': 1920, 'height': 1080}))};
+        const viewport = {viewport_js};
         Object.defineProperty(screen, 'availWidth', {{ get: () => viewport.width }});
         Object.defineProperty(screen, 'availHeight', {{ get: () => viewport.height }});
         Object.defineProperty(screen, 'width', {{ get: () => viewport.width }});
@@ -274,21 +448,22 @@ class StealthBrowser:
         if not self._page:
             return
             
-        for pattern in BLOCKED_DOMAINS:
-            try:
-                await self._page.route(pattern, lambda route: route.abort())
-                logger.debug("Blocking requests to", pattern=pattern)
-            except Exception as e:
-                logger.warning("Failed to block pattern", pattern=pattern, error=str(e))
+        try:
+            await self._page.route(BLOCKED_URL_RE, lambda route: route.abort())
+            logger.debug("Blocking requests to", patterns=len(BLOCKED_DOMAINS))
+        except Exception as e:
+            logger.warning("Failed to block tracker requests", error=str(e))
     
     async def start(self) -> Page:
-        """Start the browser with advanced stealth settings."""
-        logger.info("Starting stealth browser with enhanced anti-detection")
+        """Start the browser with advanced stealth settings.
         
-        # Load or create persistent fingerprint
-        self._fingerprint = self._load_or_create_fingerprint()
+        Set PW_INSPECT_STACK=0 to skip Playwright's per-call inspect.stack()
+        (patched at import time; off by default).
+        """
+        logger.info("Starting stealth browser with enhanced anti-detection")
         
-        self._playwright = await async_playwright().start()
+        # Load or create persistent fingerprint (file I/O off the event loop)
+        self._fingerprint = await asyncio.to_thread(self._load_or_create_fingerprint)
         
         # Select proxy if configured
         proxy_config = None
@@ -297,43 +472,8 @@ class StealthBrowser:
             proxy_config = {"server": proxy}
             logger.info("Using proxy", proxy=proxy[:30] + "...")
         
-        # Launch browser with enhanced anti-detection args
-        launch_args = [
-            "--disable-blink-features=AutomationControlled",
-            "--disable-dev-shm-usage",
-            "--no-sandbox",
-            "--disable-setuid-sandbox",
-            "--disable-infobars",
-            "--window-size=1920,1080",
-            "--start-maximized",
-            "--ignore-certificate-errors",
-            "--disable-extensions",
-            "--no-first-run",
-            "--disable-background-networking",
-            "--disable-breakpad",
-            "--disable-component-update",
-            "--disable-domain-reliability",
-            "--disable-features=AudioServiceOutOfProcess,IsolateOrigins,site-per-process",
-            "--disable-hang-monitor",
-            "--disable-ipc-flooding-protection",
-            "--disable-popup-blocking",
-            "--disable-prompt-on-repost",
-            "--disable-renderer-backgrounding",
-            "--disable-sync",
-            "--metrics-recording-only",
-            "--no-first-run",
-            "--safebrowsing-disable-auto-update",
-            # GPU args for consistent fingerprint
-            "--enable-webgl",
-            "--use-gl=angle",
-            "--use-angle=default",
-        ]
-        
-        self._browser = await self._playwright.chromium.launch(
-            headless=settings.headless,
-            slow_mo=settings.slow_mo,
-            args=launch_args
-        )
+        # Shared browser (launched once per process), own context per instance
+        self._browser = await BrowserPool.get_browser()
         
         # Use fingerprint values
         user_agent = self._fingerprint['user_agent']
@@ -370,7 +510,8 @@ class StealthBrowser:
         self._page = await self._context.new_page()
         
         # Inject comprehensive anti-detection scripts
-        await self._page.add_init_script(self._get_stealth_scripts())
+        fingerprint_hash = self._fingerprint_hash()
+        await self._page.add_init_script(self._get_stealth_scripts(fingerprint_hash))
         
         # Setup request blocking for trackers
         await self._setup_request_blocking()
@@ -378,7 +519,7 @@ class StealthBrowser:
         logger.info("Stealth browser started", 
                    user_agent=user_agent[:50], 
                    viewport=viewport,
-                   fingerprint_hash=hashlib.md5(json.dumps(self._fingerprint).encode()).hexdigest()[:8])
+                   fingerprint_hash=fingerprint_hash[:8])
         return self._page
     
     async def save_session(self, force: bool = False):
@@ -402,21 +543,32 @@ class StealthBrowser:
             # But wait: if force is False, and we have auth, we should still compare 
             # with existing file if possible? No, if we have auth, we are the 'latest' truth.
             
-            os.makedirs(self._session_path.parent, exist_ok=True)
-            await self._context.storage_state(path=str(self._session_path))
+            # Write to a temp file and rename so a crash mid-write never
+            # leaves a truncated session behind
+            state = await self._context.storage_state()
+            await asyncio.to_thread(self._write_session_atomic, state)
             logger.info("Session saved", path=str(self._session_path), 
                        cookies_count=len(cookies), has_auth=has_auth)
     
+    def _write_session_atomic(self, state: dict):
+        """Write the storage state to disk via a temp file + os.replace."""
+        self._ensure_dir(self._session_path.parent)
+        tmp_path = self._session_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', buffering=1 << 16) as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._session_path)
+    
     async def screenshot(self, name: str = "screenshot") -> str:
-        """Take a screenshot and return the file path."""
+        """Take a diagnostic JPEG screenshot and return the file path."""
         if not self._page:
             raise RuntimeError("Browser not started")
         
-        os.makedirs(settings.screenshots_dir, exist_ok=True)
-        path = os.path.join(settings.screenshots_dir, f"{name}.png")
-        await self._page.screenshot(path=path, full_page=False)
-        logger.info("Screenshot saved", path=path)
-        return path
+        self._ensure_dir(settings.screenshots_dir)
+        path = Path(settings.screenshots_dir) / f"{name}.jpg"
+        raw = await self._page.screenshot(type="jpeg", quality=SCREENSHOT_JPEG_QUALITY, full_page=False)
+        await asyncio.to_thread(path.write_bytes, raw)
+        logger.info("Screenshot saved", path=str(path))
+        return str(path)
     
     @property
     def page(self) -> Page:
@@ -431,21 +583,11 @@ class StealthBrowser:
         return self._fingerprint
     
     async def close(self):
-        """Close the browser and save session."""
-        logger.info("Closing browser")
+        """Save the session and close this context (the shared browser stays up)."""
+        logger.info("Closing browser context")
         try:
             if self._context:
                 await self.save_session()
                 await self._context.close()
         except Exception as e:
             logger.warning("Error closing context", error=str(e))
-        try:
-            if self._browser:
-                await self._browser.close()
-        except Exception as e:
-            logger.warning("Error closing browser", error=str(e))
-        try:
-            if self._playwright:
-                await self._playwright.stop()
-        except Exception as e:
-            logger.warning("Error stopping playwright", error=str(e))
@@ -1,10 +1,16 @@
 """Cache for storing pending member request decisions."""
+import atexit
 import json
 import os
-from dataclasses import dataclass, asdict
-from datetime import datetime
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 from pathlib import Path
+import numpy as np
 import structlog
 
 from src.config import settings
@@ -14,6 +20,28 @@ logger = structlog.get_logger()
 CACHE_FILE = Path(settings.data_dir) / "decisions_cache.json"
 
 
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    """Set bits per uint64 element: hardware popcount on NumPy >= 2.0, unpackbits before."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _locked(method):
+    """Run a DecisionCache method while holding its lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@lru_cache(maxsize=1024)
+def _norm(name: str) -> str:
+    """Normalized cache key for a member name (memoized: the same names recur every scan)."""
+    return name.strip().lower()
+
+
 @dataclass
 class PendingRequest:
     """A member request pending decision."""
@@ -27,6 +55,7 @@ class PendingRequest:
     action_buttons: Optional[Dict[str, List[int]]] = None  # {'approve': [x,y], 'decline': [x,y]}
     cropped_path: Optional[str] = None  # Path to cropped card image (text bbox only)
     is_unanswered: bool = False  # Whether the user hasn't answered questions
+    notified_at_ts: float = 0.0  # notified_at as epoch seconds, for cheap age checks
 
 
 class DecisionCache:
@@ -35,21 +64,32 @@ class DecisionCache:
     def __init__(self):
         self._cache: Dict[str, PendingRequest] = {}
         self._hash_cache: Dict[str, str] = {}  # hash -> name mapping for quick lookup
+        self._hash_index = None  # (uint64 hashes, names) built lazily from _hash_cache
+        self._lock = threading.RLock()  # mutations vs. writes (Telegram thread + event loop)
+        self._local = threading.local()  # per-thread batch depth: batch() never defers other threads
+        self._dirty = False  # unsaved changes from a deferred save
+        self._dir_created = False  # CACHE_FILE.parent exists (checked on first write)
         self._load()
+        atexit.register(self._flush)
     
     def _get_key(self, name: str) -> str:
         """Generate a unique key for a member name."""
         # Normalize name for consistent matching
-        return name.strip().lower()
+        return _norm(name)
     
     def _load(self):
         """Load cache from disk."""
         if CACHE_FILE.exists():
             try:
                 with open(CACHE_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                    data = json.loads(f.read())
                     for key, value in data.get("pending", {}).items():
                         self._cache[key] = PendingRequest(**value)
+                        if not self._cache[key].notified_at_ts:
+                            # Entries saved before notified_at_ts existed: parse once here
+                            self._cache[key].notified_at_ts = datetime.fromisoformat(
+                                self._cache[key].notified_at
+                            ).timestamp()
                         # Rebuild hash cache
                         if self._cache[key].card_hash:
                             self._hash_cache[self._cache[key].card_hash] = self._cache[key].name
@@ -60,48 +100,118 @@ class DecisionCache:
         else:
             logger.info("No existing cache, starting fresh")
     
+    @contextmanager
+    def batch(self):
+        """Group this thread's mutations into a single save on exit (nestable).
+        
+        The depth is thread-local, so saves from other threads (e.g. Telegram
+        decisions) still hit disk immediately.
+        """
+        self._local.depth = self._batch_depth() + 1
+        try:
+            yield self
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._flush()
+    
+    def _batch_depth(self) -> int:
+        """Nesting depth of batch() in the calling thread."""
+        return getattr(self._local, "depth", 0)
+    
+    @_locked
+    def _flush(self):
+        """Write deferred changes, if any."""
+        if self._dirty:
+            self._write()
+    
     def _save(self):
-        """Save cache to disk."""
-        os.makedirs(CACHE_FILE.parent, exist_ok=True)
+        """Save cache to disk, or defer until the enclosing batch() ends."""
+        if self._batch_depth() > 0:
+            self._dirty = True
+            return
+        self._write()
+    
+    @_locked
+    def _write(self):
+        """Write the whole cache to disk."""
+        self._dirty = False
+        if not self._dir_created:
+            os.makedirs(CACHE_FILE.parent, exist_ok=True)
+            self._dir_created = True
         try:
-            data = {
-                "pending": {k: asdict(v) for k, v in self._cache.items()}
-            }
-            with open(CACHE_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Build the string once, then a single write; json.dump streams many
+            # small writes. indent=2 keeps the file readable by hand. PendingRequest is
+            # flat, so the encoder reads each instance's __dict__ via default=vars
+            # (same output as asdict(), with no per-save snapshot dict or deep copy)
+            payload = json.dumps({"pending": self._cache}, default=vars, ensure_ascii=False, indent=2)
+            # Write a sibling file and swap it in, so a crash never leaves a truncated cache
+            tmp_file = CACHE_FILE.with_suffix(".json.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_file, CACHE_FILE)
             logger.debug("Cache saved", count=len(self._cache))
         except Exception as e:
             logger.error("Failed to save cache", error=str(e))
 
+    def _get_hash_index(self):
+        """Packed uint64 view of _hash_cache, rebuilt after the mapping changes."""
+        if self._hash_index is None:
+            hashes, names = [], []
+            for cached_hash, name in self._hash_cache.items():
+                try:
+                    hashes.append(int(cached_hash, 16))
+                    names.append(name)
+                except ValueError:
+                    logger.warning(f"Skipping invalid cached hash: {cached_hash}")
+            self._hash_index = (np.array(hashes, dtype=np.uint64), names)
+        return self._hash_index
+
+    def _index_hash(self, card_hash: str, name: str):
+        """Add a hash to _hash_cache, appending to the packed index instead of rebuilding it."""
+        if self._hash_index is not None and card_hash not in self._hash_cache:
+            try:
+                hashes, names = self._hash_index
+                self._hash_index = (np.append(hashes, np.uint64(int(card_hash, 16))), names + [name])
+            except ValueError:
+                self._hash_index = None  # Invalid hex: let the rebuild log and skip it
+        else:
+            self._hash_index = None
+        self._hash_cache[card_hash] = name
+
+    @_locked
     def is_hash_similar(self, new_hash: str, threshold: int) -> Optional[str]:
         """
         Check if a similar hash already exists in cache.
         
         Args:
-            new_hash: The perceptual hash of the new card image
+            new_hash: The perceptual hash of the new card image (64-bit hex)
             threshold: Maximum Hamming distance to consider as "same" card
 
         Returns:
-            Name of the matching request if found, None otherwise
+            Name of the closest matching request if found, None otherwise
         """
         if threshold <= 0:
             return None  # Feature disabled
 
         try:
-            import imagehash
-            new_hash_obj = imagehash.hex_to_hash(new_hash)
+            hashes, names = self._get_hash_index()
+            if not names:
+                return None
 
-            for cached_hash, name in self._hash_cache.items():
-                cached_hash_obj = imagehash.hex_to_hash(cached_hash)
-                distance = new_hash_obj - cached_hash_obj
-                if distance <= threshold:
-                    logger.debug(f"Hash match found: distance={distance}, name={name}")
-                    return name
+            # Hamming distance to every cached hash at once: XOR + popcount
+            xor = hashes ^ np.uint64(int(new_hash, 16))
+            distances = _popcount64(xor)
+            best = int(np.argmin(distances))
+            if distances[best] <= threshold:
+                logger.debug(f"Hash match found: distance={distances[best]}, name={names[best]}")
+                return names[best]
         except Exception as e:
             logger.warning(f"Hash comparison error: {e}")
         
         return None
     
+    @_locked
     def add_notification(self, name: str, extra_info: Optional[str] = None, card_hash: Optional[str] = None, 
                         preview_path: Optional[str] = None, action_buttons: Optional[Dict[str, List[int]]] = None,
                         cropped_path: Optional[str] = None, is_unanswered: bool = False) -> bool:
@@ -113,9 +223,11 @@ class DecisionCache:
             logger.debug("Already in cache, skipping", name=name)
             return False  # Don't send duplicate notification
         
+        now = datetime.now()
         self._cache[key] = PendingRequest(
             name=name,
-            notified_at=datetime.now().isoformat(),
+            notified_at=now.isoformat(),
+            notified_at_ts=now.timestamp(),
             extra_info=extra_info,
             card_hash=card_hash,
             preview_path=preview_path,
@@ -126,12 +238,13 @@ class DecisionCache:
         
         # Add to hash cache
         if card_hash:
-            self._hash_cache[card_hash] = name
+            self._index_hash(card_hash, name)
         
         self._save()
         logger.info("Notification added to cache", name=name)
         return True
     
+    @_locked
     def set_decision(self, name: str, decision: str) -> bool:
         """Set the decision (approve/decline) for a request."""
         key = self._get_key(name)
@@ -151,6 +264,7 @@ class DecisionCache:
             if req.decision is not None and not req.executed
         ]
     
+    @_locked
     def mark_executed(self, name: str):
         """Mark a request as executed (remove from cache)."""
         key = self._get_key(name)
@@ -158,6 +272,7 @@ class DecisionCache:
             # Remove from hash cache too
             if self._cache[key].card_hash:
                 self._hash_cache.pop(self._cache[key].card_hash, None)
+                self._hash_index = None
             del self._cache[key]
             self._save()
             logger.info("Request executed and removed", name=name)
@@ -172,6 +287,7 @@ class DecisionCache:
         key = self._get_key(name)
         return key in self._cache
     
+    @_locked
     def cleanup_old(self, max_age_hours: int = 360, pending_decision_max_hours: int = 360):
         """
         Remove old entries from cache.
@@ -182,26 +298,32 @@ class DecisionCache:
                                         this many hours (default: 360h = 15 days). These are likely
                                         requests that were handled by another moderator.
         """
-        now = datetime.now()
+        now_ts = time.time()
+        # Cutoffs computed once; entries only need a float comparison
+        no_decision_cutoff = now_ts - max_age_hours * 3600
+        pending_cutoff = now_ts - pending_decision_max_hours * 3600
         to_remove = []
 
         for key, req in self._cache.items():
-            notified = datetime.fromisoformat(req.notified_at)
-            age_hours = (now - notified).total_seconds() / 3600
+            # Executed entries are deleted on execution
+            if req.executed:
+                continue
+            notified = req.notified_at_ts
 
             # Case 1: No decision yet, older than max_age_hours
-            if req.decision is None and age_hours > max_age_hours:
-                to_remove.append((key, "no decision"))
-                continue
+            if req.decision is None:
+                if notified < no_decision_cutoff:
+                    to_remove.append((key, "no decision"))
 
             # Case 2: Decision pending but never executed, older than pending_decision_max_hours
-            if req.decision is not None and not req.executed and age_hours > pending_decision_max_hours:
+            elif notified < pending_cutoff:
                 to_remove.append((key, f"stale pending ({req.decision})"))
 
         for key, reason in to_remove:
             # Clean up hash cache
             if self._cache[key].card_hash:
                 self._hash_cache.pop(self._cache[key].card_hash, None)
+                self._hash_index = None
             name = self._cache[key].name
             del self._cache[key]
             logger.info(f"Removed stale entry: '{name}' ({reason})")
@@ -213,16 +335,15 @@ class DecisionCache:
 
 def cleanup_old_screenshots(screenshots_dir: str, max_age_days: int = 15):
     """Delete screenshot files older than max_age_days."""
-    from pathlib import Path
-    from datetime import timedelta
-    
-    cutoff = datetime.now() - timedelta(days=max_age_days)
+    cutoff_ts = (datetime.now() - timedelta(days=max_age_days)).timestamp()
     count = 0
     try:
-        for f in Path(screenshots_dir).glob("*.png"):
-            if datetime.fromtimestamp(f.stat().st_mtime) < cutoff:
-                f.unlink()
-                count += 1
+        # scandir + float mtime compare: no Path or datetime object per file
+        with os.scandir(screenshots_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith((".png", ".jpg")) and entry.stat().st_mtime < cutoff_ts:
+                    os.unlink(entry.path)
+                    count += 1
         if count:
             logger.info(f"Screenshot cleanup: deleted {count} files older than {max_age_days} days")
     except Exception as e:
@@ -30,6 +30,18 @@ class Settings(BaseSettings):
     # Browser settings
     headless: bool = Field(default=True, description="Run browser in headless mode")
     slow_mo: int = Field(default=100, description="Slow down actions by ms")
+    click_move_steps: int = Field(
+        default=10,
+        description="Mouse move steps before direct button clicks (0 = click without moving first)"
+    )
+    realistic_scroll: bool = Field(
+        default=False,
+        description="Scroll with chunked mouse-wheel events instead of one smooth scrollBy"
+    )
+    cdp_endpoint: Optional[str] = Field(
+        default=None,
+        description="CDP URL of an already running Chrome to connect to instead of launching one (e.g. http://localhost:9222)"
+    )
     
     # Proxy settings (for IP rotation - stealth)
     proxy_list: List[str] = Field(
@@ -39,6 +51,7 @@ class Settings(BaseSettings):
     
     # Debug settings
     debug_click_overlay: bool = Field(default=True, description="Save debug images showing click positions")
+    keep_login_screenshots: bool = Field(default=True, description="Save login page screenshots to screenshots_dir")
     debug_ai_validation: bool = Field(default=True, description="Use OpenRouter AI to validate click positions")
     
     # Polling with jitter (stealth)
@@ -53,6 +66,16 @@ class Settings(BaseSettings):
         default=1,
         description="Hamming distance threshold for card image similarity (0=disabled, 2=strict)"
     )
+    card_hash_skip_ocr: bool = Field(
+        default=False,
+        description="Skip OCR for cards matching an already-notified request with no pending decision"
+    )
+    
+    # OCR recognition model override (e.g. INT8 model from quantize_ocr_model.py)
+    ocr_rec_model_path: Optional[str] = Field(
+        default=None,
+        description="Path to an alternative RapidOCR recognition ONNX model (None = bundled FP32)"
+    )
     
     # Paths (REMOVED /app prefix to work both locally and in Docker)
     data_dir: str = Field(default="data", description="Data directory path")
@@ -64,5 +87,6 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-# Global settings instance
+# Global settings instance. Kept as the pydantic model: field reads are plain
+# instance-dict lookups, and scripts assign fields at startup (e.g. headless)
 settings = Settings()
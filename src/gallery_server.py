@@ -4,13 +4,13 @@ Runs on port 8081 and serves all screenshots as a responsive gallery.
 """
 import os
 import http.server
-import socketserver
 from pathlib import Path
 from urllib.parse import unquote
 import json
 import logging
 import io
 import sys
+import time
 
 try:
     from PIL import Image
@@ -312,8 +312,9 @@ GALLERY_HTML = """
 
             container.innerHTML = sortedKeys.map(id => {
                 const groupImages = groups[id];
-                // Try to find the main "card_N.png" for thumbnail, otherwise use first
-                let thumbImg = groupImages.find(img => img.name === `card_${id}.png` || img.name === `card${id}.png`) || groupImages[0];
+                // Try to find the main "card_N.jpg"/"card_N.png" for thumbnail, otherwise use first
+                const thumbNames = [`card_${id}.jpg`, `card_${id}.png`, `card${id}.jpg`, `card${id}.png`];
+                let thumbImg = groupImages.find(img => thumbNames.includes(img.name)) || groupImages[0];
                 
                 return `
                 <div class="card folder" onclick="openGroup('${id}')">
@@ -408,6 +409,11 @@ GALLERY_HTML = """
 </body>
 </html>
 """
+GALLERY_HTML_BYTES = GALLERY_HTML.encode("utf-8")  # Static page, encoded once
+
+# /api/screenshots response, reused while the screenshots directory is unchanged
+LISTING_CACHE_TTL = 10  # seconds
+_listing_cache = {"mtime": None, "built": 0.0, "payload": b"[]"}
 
 class GalleryHandler(http.server.SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
@@ -420,32 +426,19 @@ class GalleryHandler(http.server.SimpleHTTPRequestHandler):
         
         if self.path == '/' or self.path == '/index.html':
             self.send_response(200)
-            self.send_header('Content-type', 'text/html')
+            self.send_header('Content-type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(GALLERY_HTML_BYTES)))
             self.send_header('Cache-Control', 'no-store, must-revalidate')
             self.end_headers()
-            self.wfile.write(GALLERY_HTML.encode())
+            self.wfile.write(GALLERY_HTML_BYTES)
             
         elif self.path == '/api/screenshots':
+            payload = self._screenshots_payload()
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
             self.end_headers()
-            
-            screenshots = []
-            screenshots_path = Path(self.screenshots_dir)
-            
-            if screenshots_path.exists():
-                for f in sorted(screenshots_path.glob('*.png'), key=os.path.getmtime, reverse=True):
-                    try:
-                        stat = f.stat()
-                        screenshots.append({
-                            'name': f.name,
-                            'size': round(stat.st_size / 1024, 1),
-                            'modified': self._format_time(stat.st_mtime)
-                        })
-                    except Exception as e:
-                        logger.error(f"Error reading file stats for {f}: {e}")
-            
-            self.wfile.write(json.dumps(screenshots).encode())
+            self.wfile.write(payload)
             
         elif self.path.startswith('/thumbnail/'):
             filename = unquote(self.path[11:])
@@ -493,25 +486,66 @@ class GalleryHandler(http.server.SimpleHTTPRequestHandler):
             
     def _serve_file(self, filepath: Path):
         if filepath.exists() and filepath.suffix.lower() in ['.png', '.jpg', '.jpeg', '.gif', '.webp']:
-            self.send_response(200)
-            content_type = 'image/png' if filepath.suffix == '.png' else 'image/jpeg'
-            self.send_header('Content-type', content_type)
-            self.send_header('Content-Length', str(filepath.stat().st_size))
-            self.end_headers()
             with open(filepath, 'rb') as f:
-                self.wfile.write(f.read())
+                size = os.fstat(f.fileno()).st_size  # One stat for header and transfer
+                self.send_response(200)
+                content_type = 'image/png' if filepath.suffix == '.png' else 'image/jpeg'
+                self.send_header('Content-type', content_type)
+                self.send_header('Content-Length', str(size))
+                self.end_headers()
+                # Kernel-side copy via os.sendfile where available (socket falls back to read/send)
+                self.connection.sendfile(f, 0, size)
         else:
             self.send_error(404, 'File not found')
     
+    def _screenshots_payload(self) -> bytes:
+        """JSON listing of screenshots, newest first, rebuilt only when the directory changes.
+        
+        Keyed on the directory mtime (files added/removed), with a short TTL for
+        files overwritten in place, which don't touch the directory mtime.
+        """
+        try:
+            dir_mtime = os.stat(self.screenshots_dir).st_mtime_ns
+        except OSError:
+            return b"[]"
+        
+        now = time.monotonic()
+        if (_listing_cache["mtime"] == dir_mtime
+                and now - _listing_cache["built"] < LISTING_CACHE_TTL):
+            return _listing_cache["payload"]
+        
+        entries = []
+        with os.scandir(self.screenshots_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(('.png', '.jpg')):
+                    continue
+                try:
+                    entries.append((entry.name, entry.stat()))
+                except OSError as e:
+                    logger.error(f"Error reading file stats for {entry.path}: {e}")
+        entries.sort(key=lambda e: e[1].st_mtime, reverse=True)
+        
+        screenshots = [{
+            'name': name,
+            'size': round(stat.st_size / 1024, 1),
+            'modified': self._format_time(stat.st_mtime)
+        } for name, stat in entries]
+        
+        payload = json.dumps(screenshots).encode()
+        _listing_cache.update(mtime=dir_mtime, built=now, payload=payload)
+        return payload
+    
     def _format_time(self, timestamp):
-        from datetime import datetime
-        dt = datetime.fromtimestamp(timestamp)
-        return dt.strftime('%Y-%m-%d %H:%M:%S')
+        # '%Y-%m-%d %H:%M:%S' without a datetime object or strftime's locale handling
+        t = time.localtime(timestamp)
+        return (f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} "
+                f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}")
 
 def run_server():
     os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
-    socketserver.TCPServer.allow_reuse_address = True
-    with socketserver.TCPServer(("", PORT), GalleryHandler) as httpd:
+    # One thread per connection, so image loads don't queue behind each other
+    # (HTTPServer already sets allow_reuse_address; worker threads are daemons)
+    with http.server.ThreadingHTTPServer(("", PORT), GalleryHandler) as httpd:
         print(f"📸 Gallery server running at http://0.0.0.0:{PORT}", flush=True)
         httpd.serve_forever()
 
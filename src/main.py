@@ -7,7 +7,7 @@ from typing import Optional
 import structlog
 
 from src.config import settings
-from src.browser.stealth_browser import StealthBrowser
+from src.browser.stealth_browser import StealthBrowser, BrowserPool
 from src.vision.screenshot_analyzer import ScreenshotAnalyzer
 from src.actions.facebook_login import FacebookLogin
 from src.actions.group_moderator import GroupModerator
@@ -21,6 +21,7 @@ structlog.configure(
         structlog.dev.ConsoleRenderer()
     ],
     wrapper_class=structlog.make_filtering_bound_logger(20),
+    cache_logger_on_first_use=True,  # module-level proxies resolve once, not on every call
 )
 
 logger = structlog.get_logger()
@@ -63,7 +64,7 @@ class FBClickerBot:
             logger.warning("Not logged in - session may be expired")
             self.telegram.send_message(
                 "⚠️ Sessione Facebook scaduta!\n\n"
-                "Esegui di nuovo `manual_login.py` per fare il login."
+                "Esegui di nuovo `python -m src.manual_login` per fare il login."
             )
             while not await self.login_handler.is_logged_in():
                 logger.info("Waiting for valid session...")
@@ -86,23 +87,25 @@ class FBClickerBot:
     def _cleanup_old_screenshots(self, max_age_hours: int = 360):
         """Delete screenshots older than max_age_hours (default: 360h = 15 days)."""
         import os
-        from pathlib import Path
         import time
         
-        screenshots_dir = Path(settings.screenshots_dir)
-        if not screenshots_dir.exists():
+        if not os.path.isdir(settings.screenshots_dir):
             return
         
         cutoff_time = time.time() - (max_age_hours * 3600)
         deleted_count = 0
         
-        for file in screenshots_dir.glob("*.png"):
-            try:
-                if file.stat().st_mtime < cutoff_time:
-                    file.unlink()
-                    deleted_count += 1
-            except Exception as e:
-                logger.warning(f"Failed to delete old screenshot {file.name}: {e}")
+        # scandir: one stat per image, no Path object per directory entry
+        with os.scandir(settings.screenshots_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith((".png", ".jpg")):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff_time:
+                        os.unlink(entry.path)
+                        deleted_count += 1
+                except Exception as e:
+                    logger.warning(f"Failed to delete old screenshot {entry.name}: {e}")
         
         if deleted_count > 0:
             logger.info(f"Cleaned up {deleted_count} old screenshots")
@@ -126,8 +129,11 @@ class FBClickerBot:
                         logger.info("Entering night mode - closing browser to preserve session")
                         self.telegram.send_message("🌙 Pausa notturna (22:00-06:00) - Chiudo browser per preservare sessione")
                         
+                        if self.moderator:
+                            await self.moderator.close()
                         if self.browser:
                             await self.browser.close()
+                        await BrowserPool.shutdown()  # Free Chromium for the night
                         
                         self._night_mode = True
                     
@@ -153,7 +159,7 @@ class FBClickerBot:
                         logger.warning("Not logged in after restart - session may have expired")
                         self.telegram.send_message(
                             "⚠️ Sessione Facebook scaduta dopo la pausa notturna!\\n\\n"
-                            "Esegui di nuovo `manual_login.py` per fare il login."
+                            "Esegui di nuovo `python -m src.manual_login` per fare il login."
                         )
                         while not await self.login_handler.is_logged_in():
                             logger.info("Waiting for valid session...")
@@ -194,12 +200,15 @@ class FBClickerBot:
                     # Add to cache so we can track the decision (with hash and preview for future matching)
                     cache.add_notification(name, extra_info, card_hash, preview_path, action_buttons, cropped_path, is_unanswered)
                     
+                    # Telegram sends block until delivered, so run them in a worker thread
+                    # to let the moderator dispatch several notifications concurrently
                     # If user hasn't answered questions, send simplified text-only notification
                     if is_unanswered:
-                        self.telegram.send_message(f"⏳ <b>{name}</b> non ha risposto alle domande - verrà cancellato automaticamente da FB")
+                        await asyncio.to_thread(self.telegram.send_message, f"⏳ <b>{name}</b> non ha risposto alle domande - verrà cancellato automaticamente da FB")
                         logger.info(f"Sent simplified notification for: {name} [unanswered questions]")
                     else:
-                        self.telegram.send_member_request(
+                        await asyncio.to_thread(
+                            self.telegram.send_member_request,
                             name=name,
                             extra_info=extra_info,
                             screenshot_path=screenshot_path,
@@ -207,17 +216,21 @@ class FBClickerBot:
                         )
                         logger.info(f"Sent notification for: {name}" + (" [with preview]" if preview_path else ""))
                 
-                actions = await self.moderator.process_and_notify(
-                    pending_decisions=decision_dict,
-                    telegram_callback=notification_callback
-                )
+                # One cache save for all notifications added during the scan (batching is
+                # per-thread: Telegram decisions arriving meanwhile are still saved at once)
+                with cache.batch():
+                    actions = await self.moderator.process_and_notify(
+                        pending_decisions=decision_dict,
+                        telegram_callback=notification_callback
+                    )
                 
                 if actions:
                     logger.info(f"Executed {len(actions)} actions")
                     # Mark all processed decisions as executed
-                    for name in actions:
-                        cache.mark_executed(name)
-                        self.telegram.send_message(f"✅ Eseguito: <b>{name}</b>")
+                    with cache.batch():
+                        for name in actions:
+                            cache.mark_executed(name)
+                            self.telegram.send_message(f"✅ Eseguito: <b>{name}</b>")
                     
                     # If actions were taken, recycle immediately (don't wait for full interval)
                     logger.info("Actions taken - restarting poll immediately to process remaining items")
@@ -258,8 +271,12 @@ class FBClickerBot:
         if self.analyzer:
             await self.analyzer.close()
         
+        if self.moderator:
+            await self.moderator.close()
+        
         if self.browser:
             await self.browser.close()
+        await BrowserPool.shutdown()
         
         logger.info("Bot stopped")
 
@@ -7,22 +7,46 @@ same paths the bot loads on startup.
 
 Avoids the brittleness of exporting/importing storage_state between
 machines: same Python, same fingerprint, same files.
+
+Pass --no-verify-cookies to skip the c_user/xs auth-cookie checks and
+save whatever session the browser holds (e.g. when debugging login).
 """
+import argparse
 import asyncio
 import json
+import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from src.browser.stealth_browser import StealthBrowser
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.browser.stealth_browser import StealthBrowser, BrowserPool
 from src.config import settings
 
 
 GROUP_URL_TEMPLATE = "https://www.facebook.com/groups/{gid}/participant_requests?orderby=chronological"
 
+# Either the login form or the logged-in profile button means the page is usable
+PAGE_READY_SELECTOR = (
+    'input[name="email"], [aria-label="Your profile"], [aria-label="Il tuo profilo"]'
+)
+CLOSE_BUTTON_SELECTOR = 'div[role="dialog"] [aria-label="Close"], div[role="dialog"] [aria-label="Chiudi"]'
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="FBClicker manual login")
+    parser.add_argument(
+        "--verify-cookies",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Require c_user/xs auth cookies before and after saving (default: on)",
+    )
+    return parser.parse_args(argv)
 
-async def main() -> int:
+
+async def main(args: argparse.Namespace) -> int:
     print("=" * 60)
     print("FBClicker - Manual Login (in-container)")
     print("=" * 60)
@@ -42,9 +66,20 @@ async def main() -> int:
         print()
 
         print("Opening Facebook...")
-        await page.goto("https://www.facebook.com/")
-        await asyncio.sleep(3)
+        await page.goto("https://www.facebook.com/", wait_until="domcontentloaded")
+        try:
+            await page.wait_for_selector(PAGE_READY_SELECTOR, timeout=5000)
+        except PlaywrightTimeoutError:
+            pass  # Slow or unexpected page; the user drives from here anyway
+
+        # Two back-to-back escapes handle stacked modals (Messenger + cookie);
+        # no sleep needed, Playwright serializes the key events
         await page.keyboard.press("Escape")
+        await page.keyboard.press("Escape")
+        try:
+            await page.locator(CLOSE_BUTTON_SELECTOR).first.click(timeout=500)
+        except PlaywrightTimeoutError:
+            pass
 
         gid = settings.fb_group_id
         group_url = GROUP_URL_TEMPLATE.format(gid=gid) if gid else None
@@ -66,47 +101,53 @@ async def main() -> int:
             subprocess.run(
                 ["xdotool", "search", "--name", "FBClicker - manual login",
                  "windowactivate", "--sync"],
-                env={**__import__("os").environ, "DISPLAY": os.environ.get("DISPLAY", ":99")},
+                env={**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":99")},
                 check=False, timeout=5, capture_output=True,
             )
         except Exception:
             pass
 
-        # Loop so the user can retry cookie check after solving 2FA
-        cookies = []
-        for attempt in (1, 2):
-            await asyncio.get_event_loop().run_in_executor(
-                None, lambda: input(
-                    f"Press ENTER when logged in (attempt {attempt}/2)..."
+        if args.verify_cookies:
+            # Loop so the user can retry cookie check after solving 2FA
+            cookies = []
+            for attempt in (1, 2):
+                await asyncio.to_thread(
+                    input, f"Press ENTER when logged in (attempt {attempt}/2)..."
                 )
-            )
 
-            context = browser._context
-            cookies = await context.cookies()
-            names = [c["name"] for c in cookies]
-            has_c_user = "c_user" in names
-            has_xs = "xs" in names
-            print(f"  Found {len(cookies)} cookies")
-            print(f"  c_user: {'OK' if has_c_user else 'MISSING'}")
-            print(f"  xs:     {'OK' if has_xs else 'MISSING'}")
-            if has_c_user and has_xs:
-                break
-            print("  Auth cookies missing, please complete login then retry.")
-
-        if "c_user" not in [c["name"] for c in cookies] or \
-           "xs"     not in [c["name"] for c in cookies]:
-            print()
-            print("ERROR: auth cookies still missing. Aborting save.")
-            return 1
+                context = browser._context
+                cookies = await context.cookies()
+                names = {c["name"] for c in cookies}
+                has_c_user = "c_user" in names
+                has_xs = "xs" in names
+                print(f"  Found {len(cookies)} cookies")
+                print(f"  c_user: {'OK' if has_c_user else 'MISSING'}")
+                print(f"  xs:     {'OK' if has_xs else 'MISSING'}")
+                if has_c_user and has_xs:
+                    break
+                print("  Auth cookies missing, please complete login then retry.")
+
+            if {"c_user", "xs"} - {c["name"] for c in cookies}:
+                print()
+                print("ERROR: auth cookies still missing. Aborting save.")
+                return 1
+        else:
+            await asyncio.to_thread(input, "Press ENTER when logged in...")
 
         # Force=True: we are explicitly saving a user-confirmed session
         await browser.save_session(force=True)
 
-        with open(browser._session_path) as f:
-            saved = json.load(f)
-        saved_names = [c["name"] for c in saved.get("cookies", [])]
-        print()
-        print(f"Saved {len(saved_names)} cookies: {sorted(set(saved_names))}")
+        if args.verify_cookies:
+            # Read off the event loop so Playwright's pipe keeps draining
+            data = await asyncio.to_thread(browser._session_path.read_bytes)
+            saved = json.loads(data)
+            saved_cookies = saved.get("cookies", [])
+            saved_names = {c["name"] for c in saved_cookies}
+            print()
+            print(f"Saved {len(saved_cookies)} cookies: {sorted(saved_names)}")
+            missing = {"c_user", "xs"} - saved_names
+            if missing:
+                print(f"WARNING: auth cookies were NOT saved to file: {sorted(missing)}")
 
         print()
         print("=" * 60)
@@ -116,13 +157,12 @@ async def main() -> int:
         print("  3. Start the bot normally:  docker compose up -d fbclicker")
         print("=" * 60)
 
-        await asyncio.get_event_loop().run_in_executor(
-            None, lambda: input("Press ENTER to close the browser...")
-        )
+        await asyncio.to_thread(input, "Press ENTER to close the browser...")
         return 0
     finally:
         await browser.close()
+        await BrowserPool.shutdown()
 
 
 if __name__ == "__main__":
-    sys.exit(asyncio.run(main()))
+    sys.exit(asyncio.run(main(parse_args())))
@@ -7,6 +7,7 @@ import asyncio
 import threading
 from typing import Dict, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import RetryAfter
 from telegram.ext import (
     Application, 
     CommandHandler, 
@@ -22,6 +23,8 @@ from src.cache import cache
 
 logger = structlog.get_logger()
 
+_SEND_ATTEMPTS = 3  # Tries per Telegram call when flood control answers 429
+
 
 class TelegramBot:
     """Telegram bot for remote control and manual approvals.
@@ -148,12 +151,33 @@ class TelegramBot:
             if self._thread.is_alive():
                 logger.warning("Telegram bot thread did not stop cleanly")
     
+    async def _send_with_retry(self, send, **kwargs):
+        """Call a bot send method, waiting out Telegram flood control (RetryAfter).
+        
+        Upload buffers are rewound before each attempt since a failed call may
+        already have read them.
+        """
+        for attempt in range(1, _SEND_ATTEMPTS + 1):
+            for value in kwargs.values():
+                if isinstance(value, io.BytesIO):
+                    value.seek(0)
+            try:
+                return await send(**kwargs)
+            except RetryAfter as e:
+                if attempt == _SEND_ATTEMPTS:
+                    raise
+                delay = e.retry_after
+                delay = delay.total_seconds() if hasattr(delay, "total_seconds") else float(delay)
+                logger.warning(f"Telegram flood control, retrying in {delay:.0f}s", attempt=attempt)
+                await asyncio.sleep(delay)
+    
     async def _send_message_internal(self, text: str):
         """Internal async send message (runs in bot's thread)."""
         if self.app:
             for admin_id in self.admin_ids:
                 try:
-                    await self.app.bot.send_message(
+                    await self._send_with_retry(
+                        self.app.bot.send_message,
                         chat_id=admin_id,
                         text=text,
                         parse_mode="HTML"
@@ -175,9 +199,9 @@ class TelegramBot:
             self._send_message_internal(text),
             self._loop
         )
-        # Wait for it to complete (with timeout)
+        # Wait for it to complete (with timeout, leaving room for flood-control retries)
         try:
-            future.result(timeout=10)
+            future.result(timeout=60)
         except Exception as e:
             logger.error("Failed to send Telegram message", error=str(e))
     
@@ -262,13 +286,15 @@ class TelegramBot:
                         InputMediaPhoto(media=card_buffer, caption="👤 Scheda utente"),
                         InputMediaPhoto(media=preview_buffer, caption="📄 Anteprima post")
                     ]
-                    await self.app.bot.send_media_group(
+                    await self._send_with_retry(
+                        self.app.bot.send_media_group,
                         chat_id=admin_id,
                         media=media_group
                     )
                     
                     # Then send text with buttons
-                    await self.app.bot.send_message(
+                    await self._send_with_retry(
+                        self.app.bot.send_message,
                         chat_id=admin_id,
                         text=message,
                         parse_mode="HTML",
@@ -279,7 +305,8 @@ class TelegramBot:
                 elif card_buffer:
                     # Only card: send as single photo with caption and buttons
                     logger.info(f"Sending card photo to {admin_id} for {name}")
-                    await self.app.bot.send_photo(
+                    await self._send_with_retry(
+                        self.app.bot.send_photo,
                         chat_id=admin_id,
                         photo=card_buffer,
                         caption=message,
@@ -290,7 +317,8 @@ class TelegramBot:
                     
                 else:
                     # No images: just text
-                    await self.app.bot.send_message(
+                    await self._send_with_retry(
+                        self.app.bot.send_message,
                         chat_id=admin_id,
                         text=message,
                         parse_mode="HTML",
@@ -302,7 +330,8 @@ class TelegramBot:
                 logger.error(f"Failed to send notification to {admin_id}: {e}")
                 # Fallback to text only
                 try:
-                    await self.app.bot.send_message(
+                    await self._send_with_retry(
+                        self.app.bot.send_message,
                         chat_id=admin_id,
                         text=message,
                         parse_mode="HTML",
@@ -329,7 +358,7 @@ class TelegramBot:
         )
         # Wait for it to complete (with timeout)
         try:
-            future.result(timeout=30)  # Longer timeout for media uploads
+            future.result(timeout=120)  # Longer timeout for media uploads and flood-control retries
         except Exception as e:
             logger.error("Failed to send Telegram member request", error=str(e), name=name)
     
@@ -4,7 +4,7 @@ import numpy as np
 from PIL import Image
 from pathlib import Path
 from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 import structlog
 
@@ -23,15 +23,63 @@ APPROVE_BUTTON_X_PERCENT = 0.60  # Approva is at ~60% of card width
 DECLINE_BUTTON_X_PERCENT = 0.78  # Rifiuta is at ~78% of card width
 BUTTON_Y_OFFSET = 46             # Both buttons are ~46px from top of card
 
+# Perceptual hash size (8x8 low-frequency DCT block -> 64-bit hash)
+PHASH_SIZE = 8
+PHASH_IMG_SIZE = 32
+
+# JPEG quality for scan/card/overlay images (only used for OCR and Telegram previews)
+JPEG_QUALITY = 85
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+PNG_FAST_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]  # debug PNGs: fast encode over size
+
+
+def _dct_basis(n: int, rows: int) -> np.ndarray:
+    """First `rows` rows of the orthonormal n-point DCT-II matrix (same scaling as cv2.dct)."""
+    k = np.arange(rows)[:, None]
+    i = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+# Only the low-frequency PHASH_SIZE x PHASH_SIZE block is ever needed
+_PHASH_DCT = _dct_basis(PHASH_IMG_SIZE, PHASH_SIZE)
+
+
+def compute_phashes(images: List[np.ndarray]) -> List[str]:
+    """
+    Compute 64-bit DCT perceptual hashes for several image regions (BGR or grayscale).
+    
+    Regions are resized to 32x32 and stacked, so the DCT, median threshold
+    and bit packing run as one batched NumPy pass.
+    
+    Not bit-compatible with imagehash.phash: the OpenCV INTER_AREA resize and
+    the float32 orthonormal DCT give different values, so card_hash entries
+    stored before this hash existed will not match new scans and those
+    requests are only recognised by name until they leave the cache.
+    """
+    if not images:
+        return []
+    small = np.stack([
+        cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img,
+                   (PHASH_IMG_SIZE, PHASH_IMG_SIZE), interpolation=cv2.INTER_AREA)
+        for img in images
+    ]).astype(np.float32)
+    dct = _PHASH_DCT @ small @ _PHASH_DCT.T  # (N, 8, 8)
+    flat = dct.reshape(len(images), -1)
+    bits = flat > np.median(flat, axis=1, keepdims=True)
+    return [row.tobytes().hex() for row in np.packbits(bits, axis=1)]
+
 
 @dataclass
 class DetectedCard:
     """A detected member request card."""
     y_start: int          # Top Y position in FULL page
     y_end: int            # Bottom Y position in FULL page
-    image_path: str       # Path to cropped card image
+    image_path: str       # Path to cropped card image (only written if save_images)
     card_index: int       # Index of this card (0-based)
     sidebar_width: int = 360  # Width of sidebar crop (for coordinate conversion)
+    image_array: Optional[np.ndarray] = field(default=None, repr=False)  # BGR view into the page screenshot
     
     @property
     def height(self) -> int:
@@ -41,10 +89,12 @@ class DetectedCard:
     @property
     def width(self) -> int:
         """Width of the card image in pixels."""
+        if self.image_array is not None:
+            return self.image_array.shape[1]
         try:
-            img = cv2.imread(self.image_path)
-            if img is not None:
-                return img.shape[1]
+            # PIL only parses the PNG header here, no pixel decode
+            with Image.open(self.image_path) as img:
+                return img.width
         except:
             pass
         return 1560  # Default content width
@@ -71,9 +121,6 @@ class CardDetector:
         3. Split into individual card images
         4. Return list of cards with their Y positions
         """
-        mode_label = "viewport" if viewport_mode else "full-page"
-        logger.info("=" * 60)
-        logger.info(f"CARD DETECTION START - {mode_label} mode")
         logger.info(f"  Input image: {full_page_image_path}")
         
         # Load image
@@ -82,6 +129,22 @@ class CardDetector:
             logger.error("Failed to load image", path=full_page_image_path)
             return []
         
+        return self.detect_cards_from_array(img, viewport_mode, save_images=True)
+    
+    def detect_cards_from_array(self, img: np.ndarray, viewport_mode: bool = False,
+                                save_images: bool = False, content_only: bool = False) -> List[DetectedCard]:
+        """
+        Detect member request cards in an already-decoded BGR screenshot.
+        
+        Each DetectedCard carries image_array, a view into img (no copy).
+        Card images are only written to image_path when save_images is True.
+        With content_only, img is a full-page capture already clipped to the
+        content area (sidebar and header+filter bar removed).
+        """
+        mode_label = "viewport" if viewport_mode else "full-page"
+        logger.info("=" * 60)
+        logger.info(f"CARD DETECTION START - {mode_label} mode")
+        
         height, width = img.shape[:2]
         logger.info(f"  Original image size: {width}x{height}")
         
@@ -96,7 +159,7 @@ class CardDetector:
             # Full-page: crop sidebar and full header+filter area
             content_left = SIDEBAR_WIDTH
             content_top = HEADER_HEIGHT + FILTER_BAR_HEIGHT
-            content = img[content_top:, content_left:]
+            content = img if content_only else img[content_top:, content_left:]
         
         content_height, content_width = content.shape[:2]
         logger.info(f"  Crop offsets: left={content_left}, top={content_top}")
@@ -122,9 +185,9 @@ class CardDetector:
                 logger.debug(f"  Card {i} skipped - too small: {card_img.shape[0]}px < {MIN_CARD_HEIGHT}px")
                 continue
             
-            # Save card image
-            card_path = self.screenshots_dir / f"card_{i}.png"
-            cv2.imwrite(str(card_path), card_img)
+            card_path = self.screenshots_dir / f"card_{i}.jpg"
+            if save_images:
+                cv2.imwrite(str(card_path), card_img, JPEG_PARAMS)
             
             # Calculate absolute Y positions (add back the header offset)
             abs_y_start = y_start + content_top
@@ -134,10 +197,11 @@ class CardDetector:
                 y_start=abs_y_start,
                 y_end=abs_y_end,
                 image_path=str(card_path),
-                card_index=i
+                card_index=i,
+                image_array=card_img
             ))
             
-            logger.info(f"  CARD {i}: saved to {card_path}")
+            logger.info(f"  CARD {i}: {card_path}" + ("" if save_images else " (in memory)"))
             logger.info(f"    Dimensions: {card_img.shape[1]}x{card_img.shape[0]}")
             logger.info(f"    Y range in content: {y_start}-{y_end}")
             logger.info(f"    Y range absolute: {abs_y_start}-{abs_y_end}")
@@ -619,7 +683,7 @@ class CardDetector:
 
             # Save cropped image
             cropped_path = image_path.replace(".png", "_modal.png")
-            cv2.imwrite(cropped_path, cropped)
+            cv2.imwrite(cropped_path, cropped, PNG_FAST_PARAMS)
             logger.info(f"Modal cropped to {x2-x1}x{y2-y1}, saved: {cropped_path}")
 
             return cropped_path
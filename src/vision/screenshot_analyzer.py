@@ -2,8 +2,7 @@
 import base64
 import os
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
-from PIL import Image
+from typing import List, Optional, Tuple, Union
 import httpx
 import structlog
 import cv2
@@ -22,6 +21,9 @@ CROP_TOP = 276     # Header (56) + filter bar (220) = 276
 CROP_LEFT = 360    # Sidebar width
 USER_CARD_HEIGHT = 350  # Approximate height of each user card
 
+# Fast PNG encoding for crops (level 1 is several times faster than the default 3)
+PNG_FAST_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+
 
 @dataclass
 class MemberRequest:
@@ -184,17 +186,19 @@ Return ONLY the JSON, no other text."""
         cropped_path = image_path.replace(".png", "_cropped.png")
         
         try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # Crop: left, top, right, bottom
-                cropped = img.crop((CROP_LEFT, CROP_TOP, width, height))
-                cropped.save(cropped_path)
-                
-                logger.debug("Screenshot cropped", 
-                           original_size=f"{width}x{height}",
-                           cropped_size=f"{cropped.width}x{cropped.height}")
-                
+            img = cv2.imread(image_path)
+            if img is None:
+                raise ValueError(f"could not read {image_path}")
+            height, width = img.shape[:2]
+            
+            # Crop (NumPy view): remove header and sidebar
+            cropped = img[CROP_TOP:, CROP_LEFT:]
+            cv2.imwrite(cropped_path, cropped, PNG_FAST_PARAMS)
+            
+            logger.debug("Screenshot cropped", 
+                       original_size=f"{width}x{height}",
+                       cropped_size=f"{cropped.shape[1]}x{cropped.shape[0]}")
+            
             return cropped_path
         except Exception as e:
             logger.error("Failed to crop screenshot", error=str(e))
@@ -216,32 +220,33 @@ Return ONLY the JSON, no other text."""
         user_crop_path = image_path.replace(".png", f"_user_{safe_name}.png")
         
         try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # Convert from cropped coords (GPT-4V) to original image coords
-                real_top = card_top + CROP_TOP
-                real_bottom = card_bottom + CROP_TOP
-                
-                # Validate bounds
-                if real_top < CROP_TOP:
-                    real_top = CROP_TOP
-                if real_bottom > height:
-                    real_bottom = height
-                if real_bottom <= real_top:
-                    # Invalid bounds, use fallback
-                    real_top = CROP_TOP
-                    real_bottom = min(height, CROP_TOP + 400)
-                
-                # Crop: left, top, right, bottom (remove left sidebar too)
-                cropped = img.crop((CROP_LEFT, real_top, width, real_bottom))
-                cropped.save(user_crop_path)
-                
-                logger.info("User card cropped", 
-                           user=user_name,
-                           crop_area=f"y={real_top}-{real_bottom}",
-                           card_height=real_bottom - real_top)
-                
+            img = cv2.imread(image_path)
+            if img is None:
+                raise ValueError(f"could not read {image_path}")
+            height = img.shape[0]
+            
+            # Convert from cropped coords (GPT-4V) to original image coords
+            real_top = card_top + CROP_TOP
+            real_bottom = card_bottom + CROP_TOP
+            
+            # Validate bounds
+            if real_top < CROP_TOP:
+                real_top = CROP_TOP
+            if real_bottom > height:
+                real_bottom = height
+            if real_bottom <= real_top:
+                # Invalid bounds, use fallback
+                real_top = CROP_TOP
+                real_bottom = min(height, CROP_TOP + 400)
+            
+            # Crop (NumPy view), removing left sidebar too
+            cv2.imwrite(user_crop_path, img[real_top:real_bottom, CROP_LEFT:], PNG_FAST_PARAMS)
+            
+            logger.info("User card cropped", 
+                       user=user_name,
+                       crop_area=f"y={real_top}-{real_bottom}",
+                       card_height=real_bottom - real_top)
+            
             return user_crop_path
         except Exception as e:
             logger.error("Failed to crop user area", error=str(e))
@@ -267,25 +272,28 @@ Return ONLY the JSON, no other text."""
             logger.error("Local analysis failed", error=str(e))
             return VisionResponse(page_type="error", member_requests=[])
     
-    async def detect_page_type(self, screenshot_path: str) -> str:
+    async def detect_page_type(self, screenshot: Union[str, bytes]) -> str:
         """
         Detect page type (login, member_requests, group_home, etc) using OCR.
+        
+        Accepts either a screenshot path or the encoded image bytes
+        returned by page.screenshot().
         """
         try:
-            # Load image
-            img = cv2.imread(screenshot_path)
+            # Load image (decode in-memory bytes without touching disk)
+            if isinstance(screenshot, bytes):
+                img = cv2.imdecode(np.frombuffer(screenshot, np.uint8), cv2.IMREAD_COLOR)
+            else:
+                img = cv2.imread(screenshot)
             if img is None:
                 return "unknown"
             
-            # Use OCR to check for keywords
-            from PIL import Image
-            pil_img = Image.open(screenshot_path)
-            
             # Initialize OCR if not already (lazy load)
             if not hasattr(self, '_ocr_for_detection'):
                 self._ocr_for_detection = OCREngine()
                 
-            results = self._ocr_for_detection.run_ocr(pil_img)
+            # Use OCR to check for keywords (BGR array, same as cv2.imread)
+            results = self._ocr_for_detection.run_ocr(img)
             text_lines = [line.text.lower() for line in results[0].text_lines]
             full_text = " ".join(text_lines)
             
@@ -20,7 +20,7 @@ from pathlib import Path
 # Allow running from project root or from anywhere
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from src.browser.stealth_browser import StealthBrowser
+from src.browser.stealth_browser import StealthBrowser, BrowserPool
 from src.config import settings
 
 
@@ -153,6 +153,7 @@ async def main() -> int:
                 await browser.close()
             except Exception:
                 pass
+        await BrowserPool.shutdown()
 
     if exit_code == 0:
         print(f"{PASS}session looks healthy")